@@ -0,0 +1,173 @@
+# Benchmark cases.
+#
+# Each case is registered with @case(name) and is a setup function that
+# returns the callable to time. Setup (surfaces, random data, caches) is not
+# timed. Scripts are timed as whole programs in run.py, from the per-frame
+# phase timings they write with --profile.
+
+import math
+
+import numpy as np
+import pygame
+
+from gfx.billboard import ScaleCache, draw_sprites
+from gfx.fleet import Fleet
+from gfx.particles import ParticlePool
+from gfx.raster import bla_lines, dda_lines, mid_circles
+from gfx.raycast import cast_rays, render_view
+from gfx.spatial import SpatialHash
+from gfx.tilemap import TileMap
+
+SIZE = (800, 600)
+SEED = 1234
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def random_lines(n, max_len, rng):
+    # n lines of up to max_len pixels, starting anywhere on screen (so
+    # some of them need clipping)
+    w, h = SIZE
+    x1 = rng.integers(0, w, n)
+    y1 = rng.integers(0, h, n)
+    length = rng.integers(1, max_len + 1, n)
+    angle = rng.random(n) * 2 * math.pi
+    x2 = (x1 + length * np.cos(angle)).astype(np.int64)
+    y2 = (y1 + length * np.sin(angle)).astype(np.int64)
+    return np.stack([x1, y1, x2, y2], axis=1)
+
+
+# --- Rasterizers ---
+# 1000 lines each of short, medium and screen-sized lengths
+
+for _name, _draw in (("bla", bla_lines), ("dda", dda_lines)):
+    for _label, _length in (("short", 16), ("medium", 128), ("long", 800)):
+        def _setup(draw=_draw, length=_length):
+            surface = pygame.Surface(SIZE)
+            lines = random_lines(1000, length, np.random.default_rng(SEED))
+            return lambda: draw(surface, lines, (255, 255, 255))
+        case(f"raster.{_name}_lines.{_label}")(_setup)
+
+for _r in (8, 64, 256):
+    for _filled in (False, True):
+        def _setup(r=_r, filled=_filled):
+            surface = pygame.Surface(SIZE)
+            rng = np.random.default_rng(SEED)
+            centers = np.stack([rng.integers(0, SIZE[0], 100), rng.integers(0, SIZE[1], 100)], axis=1)
+            return lambda: mid_circles(surface, centers, r, (255, 255, 255), filled)
+        case(f"raster.circles.r{_r}{'.filled' if _filled else ''}")(_setup)
+
+
+# --- Raycaster ---
+
+HOUSE = [
+    [1, 1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 0, 1, 0, 1, 0, 1],
+    [1, 0, 1, 0, 1, 0, 1, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1, 1],
+]
+TILE = 64
+FOV = math.pi / 3
+
+
+def big_map():
+    # 1024x1024 tiles, 1% walls
+    rng = np.random.default_rng(SEED)
+    return TileMap((rng.random((1024, 1024)) < 0.01).astype(np.uint8))
+
+
+for _rays in (120, 400, 800):
+    def _setup(rays=_rays):
+        level = TileMap.from_rows(HOUSE)
+        angles = np.arange(rays) * (FOV / rays) - FOV / 2 + 0.3
+        return lambda: cast_rays(level.tiles, TILE, TILE * 1.5, TILE * 1.5, angles, 800, level.field)
+    case(f"raycast.house.rays{_rays}")(_setup)
+
+for _skip in (False, True):
+    def _setup(skip=_skip):
+        level = big_map()
+        angles = np.arange(800) * (FOV / 800) - FOV / 2 + 0.3
+        field = level.field if skip else None
+        x = y = 512.5 * TILE
+        return lambda: cast_rays(level.tiles, TILE, x, y, angles, 200 * TILE, field)
+    case(f"raycast.big_map.rays800{'.skip' if _skip else ''}")(_setup)
+
+
+@case("raycast.render_view")
+def _setup():
+    surface = pygame.Surface(SIZE)
+    depth = np.random.default_rng(SEED).random(SIZE[0]) * 400 + 20
+    return lambda: render_view(surface, depth, 700, TILE, (80, 80, 80), (20, 20, 20), (40, 40, 40))
+
+
+for _count in (4, 64):
+    def _setup(count=_count):
+        surface = pygame.Surface(SIZE)
+        sprite = pygame.Surface((36, 36), pygame.SRCALPHA)
+        sprite.fill((255, 255, 255, 255))
+        cache = ScaleCache(sprite)
+        rng = np.random.default_rng(SEED)
+        sprites = [(TILE * (1.2 + rng.random() * 6.6), TILE * (1.2 + rng.random() * 3.6), cache)
+                   for _ in range(count)]
+        zbuf = np.full(SIZE[0], np.inf)
+        return lambda: draw_sprites(surface, sprites, zbuf, TILE * 1.5, TILE * 2.5, 0.0, FOV, TILE)
+    case(f"raycast.sprites.{_count}")(_setup)
+
+
+# --- Simulation ---
+
+for _n in (128, 1024, 8192):
+    def _setup(n=_n):
+        # Emitting n / 64 a frame with the default fade (64 frames from full
+        # to gone) keeps the pool full, so every call does the same work
+        surface = pygame.Surface(SIZE)
+        pool = ParticlePool(capacity=n, rng=np.random.default_rng(SEED))
+        rng = np.random.default_rng(SEED)
+        per_frame = max(1, n // 64)
+        spots = (rng.random((per_frame, 2)) * SIZE).tolist()
+
+        def frame():
+            for x, y in spots:
+                pool.emit(x, y)
+            pool.update()
+            pool.draw(surface)
+        for _ in range(64):
+            frame()
+        return frame
+    case(f"particles.{_n}")(_setup)
+
+for _n in (50, 500, 2000):
+    def _setup(n=_n):
+        # every object moves a little and looks for neighbours, as the boats
+        # and obstacles do each frame
+        rng = np.random.default_rng(SEED)
+        grid = SpatialHash(64)
+        pos = rng.random((n, 2)) * SIZE
+        vel = rng.standard_normal((n, 2))
+        for i, (x, y) in enumerate(pos.tolist()):
+            grid.insert(i, x, y, 10)
+
+        def frame():
+            pos[:] = (pos + vel) % SIZE
+            for i, (x, y) in enumerate(pos.tolist()):
+                grid.move(i, x, y, 10)
+                grid.query(x, y, 20)
+        return frame
+    case(f"collision.spatial_hash.{_n}")(_setup)
+
+for _n in (10, 1000, 100000):
+    def _setup(n=_n):
+        rng = np.random.default_rng(SEED)
+        fleet = Fleet(n)
+        up, left = rng.random(n) < 0.8, rng.random(n) < 0.5
+        down, right = ~up, ~left
+        return lambda: fleet.step(up, down, left, right)
+    case(f"physics.fleet.{_n}")(_setup)
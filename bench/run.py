@@ -0,0 +1,266 @@
+# Headless benchmark suite.
+#
+#   python bench/run.py                    run everything, compare to the baseline
+#   python bench/run.py raycast particles  only cases whose names contain these
+#   --quick                                fewer, shorter repeats
+#   --no-scripts                           skip the whole-script runs
+#   --out FILE                             results as JSON (default bench_output.txt)
+#   --baseline FILE                        default bench/baseline.json, or
+#                                          bench/baseline-quick.json with --quick
+#   --tolerance 0.25                       allowed slowdown before a case fails
+#                                          (NOISY cases allow more)
+#   --update-baseline                      store this run as the new baseline
+#
+# Everything runs under SDL's dummy video and audio drivers, so no display
+# is needed. Each case reports the median and minimum time per call in ms,
+# and a score: the fastest repeat for in-process cases and headless runs
+# (the least disturbed by whatever else the machine is doing), and the
+# fastest of the script runs' median frames. Any case whose score is more
+# than `tolerance` over the baseline's fails the run (exit status 1).
+#
+# On a shared machine a case can run 50% slower for a while, so in-process
+# cases are timed in several passes over the whole suite rather than all at
+# once, and the fastest repeat of any pass counts. A case that still comes
+# out over the tolerance is measured again (see RETRIES) before it fails.
+# The few cases that are noisy even so get a tolerance of their own (see
+# NOISY) instead of the whole suite being loosened.
+#
+# Quick and full runs time things differently, so each is compared only
+# against a baseline recorded in the same mode. Baselines are only
+# comparable on one machine.
+
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from bench.cases import CASES
+from gfx.cli import arg
+
+PROJECT = os.path.join(ROOT, "project")
+BOATS = "Boat racing simulation.py"
+
+# Whole scripts, run with a window on the dummy driver for a fixed number of
+# frames. Their cost is the work per frame (the phases they --profile, not
+# the time spent waiting on the frame cap).
+SCRIPTS = {
+    "frame.car": (ROOT, ["project.py", "--frames", "240"]),
+    "frame.boats": (PROJECT, [BOATS, "--seed", "1", "--ai", "3", "--frames", "480"]),
+    "frame.haunted_house": (PROJECT, ["stutiiiii.py", "--frames", "240"]),
+}
+# Simulation only, as fast as it goes; the scripts print how long it took
+HEADLESS = {
+    "headless.car": (ROOT, ["project.py", "--headless", "3000"], r"ticks in ([\d.]+)s", 180000),
+    "headless.boats": (PROJECT, [BOATS, "--headless", "--seed", "1", "--ai", "3", "--frames", "3000"],
+                       r"frames in ([\d.]+)s", 3000),
+}
+# glibc raises its mmap threshold as large blocks are freed, so how fast
+# NumPy's big temporaries are depends on what ran before: the same case
+# could take twice as long in a filtered run as in the full suite. The
+# script re-runs itself with the threshold fixed.
+MALLOC = {"MALLOC_MMAP_THRESHOLD_": str(64 << 20), "MALLOC_TRIM_THRESHOLD_": str(128 << 20)}
+# (passes, repeats per pass, seconds per repeat) in-process, then runs per
+# script and per headless case
+MODES = {"quick": (5, 3, 0.02, 1, 3), "full": (3, 7, 0.1, 3, 5)}
+RETRIES = 3
+# Cases whose fastest repeats are bimodal on this machine (the best is
+# sometimes half the median, sometimes not reached in a whole run), with
+# the tolerance each needs; every other case gets --tolerance
+NOISY = {"raster.circles.r64.filled": 0.5}
+
+
+def calibrate(fn, min_time):
+    # Calls per repeat, doubled until one repeat takes min_time
+    fn()
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            return calls
+        calls *= 2
+
+
+def measure(fn, calls, repeats):
+    # Seconds per call, one per repeat
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        times.append((time.perf_counter() - start) / calls)
+    return times
+
+
+def summarize(times, calls):
+    best = min(times) * 1000
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": best, "score_ms": best,
+            "calls": calls * len(times)}
+
+
+def run_script(cwd, argv, runs):
+    medians, works = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "frames.csv")
+            subprocess.run([sys.executable] + argv + ["--profile", csv_path], cwd=cwd, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            rows = np.loadtxt(csv_path, delimiter=",", skiprows=1, ndmin=2)
+        # Skip the first frames (loading, first-use caches); columns after
+        # the frame number and total are the phases
+        work = rows[min(10, len(rows) // 2):, 2:].sum(axis=1)
+        medians.append(float(np.median(work)))
+        works.append(work)
+    work = np.concatenate(works)
+    return {"median_ms": float(np.median(work)), "min_ms": float(work.min()), "score_ms": min(medians),
+            "p95_ms": float(np.percentile(work, 95)), "calls": int(len(work))}
+
+
+def run_headless(cwd, argv, pattern, frames, runs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable] + argv, cwd=cwd, check=True, capture_output=True, text=True).stdout
+        times.append(float(re.search(pattern, out).group(1)) / frames * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "score_ms": min(times),
+            "calls": frames * runs}
+
+
+def selected(name, filters):
+    return not filters or any(f in name for f in filters)
+
+
+def main():
+    mode = "quick" if "--quick" in sys.argv else "full"
+    out_path = arg("--out", os.path.join(ROOT, "bench_output.txt"))
+    baseline_name = "baseline-quick.json" if mode == "quick" else "baseline.json"
+    baseline_path = arg("--baseline", os.path.join(ROOT, "bench", baseline_name))
+    tolerance = float(arg("--tolerance", 0.25))
+    values = {sys.argv[i + 1] for i, a in enumerate(sys.argv[:-1]) if a in ("--out", "--baseline", "--tolerance")}
+    filters = [a for a in sys.argv[1:] if not a.startswith("--") and a not in values]
+    passes, repeats, min_time, script_runs, headless_runs = MODES[mode]
+
+    update = "--update-baseline" in sys.argv
+    baseline = None
+    if not update and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("mode") != mode:
+            print(f"{baseline_path} was recorded in {baseline.get('mode', 'an unknown')} mode, not {mode}; "
+                  f"compare against a {mode} baseline or record one with --update-baseline")
+            return 2
+        baseline = baseline["results"]
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    cases = {name: setup() for name, setup in CASES.items() if selected(name, filters)}
+    calls = {name: calibrate(fn, min_time) for name, fn in cases.items()}
+    times = {name: [] for name in cases}
+    for _ in range(passes):
+        for name, fn in cases.items():
+            times[name] += measure(fn, calls[name], repeats)
+    results = {}
+    for name in cases:
+        results[name] = summarize(times[name], calls[name])
+        report(name, results[name])
+    scripts = {}
+    if "--no-scripts" not in sys.argv:
+        scripts = {name: lambda cwd=cwd, argv=argv: run_script(cwd, argv, script_runs)
+                   for name, (cwd, argv) in SCRIPTS.items() if selected(name, filters)}
+        scripts.update({name: lambda cwd=cwd, argv=argv, p=pattern, n=frames: run_headless(cwd, argv, p, n, headless_runs)
+                        for name, (cwd, argv, pattern, frames) in HEADLESS.items() if selected(name, filters)})
+        for name, run in scripts.items():
+            results[name] = run()
+            report(name, results[name])
+
+    # A case over the tolerance is measured again, up to RETRIES more
+    # times, and keeps its best score: a slow spell on the machine passes,
+    # a real slowdown doesn't
+    for _ in range(RETRIES if baseline else 0):
+        slow = [name for name in results
+                if name in baseline and results[name]["score_ms"] > baseline[name]["score_ms"] * limit(name, tolerance)]
+        if not slow:
+            break
+        print(f"measuring again: {', '.join(slow)}")
+        for name in slow:
+            if name in cases:
+                times[name] += measure(cases[name], calls[name], passes * repeats)
+                results[name] = summarize(times[name], calls[name])
+            else:
+                results[name] = min(results[name], scripts[name](), key=lambda r: r["score_ms"])
+    pygame.quit()
+
+    output = {
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "python": platform.python_version(), "numpy": np.__version__,
+                    "pygame": pygame.version.ver},
+        "mode": mode,
+        "results": results,
+    }
+    with open(out_path, "w") as f:
+        json.dump(output, f, indent=2, sort_keys=True)
+
+    if update:
+        if filters and os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                old = json.load(f)
+            if old.get("mode") == mode:
+                old["results"].update(results)
+                output = dict(output, results=old["results"])
+        with open(baseline_path, "w") as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+        print(f"baseline written to {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"no baseline at {baseline_path}; run with --update-baseline to make one")
+        return 0
+    return compare(results, baseline, tolerance)
+
+
+def report(name, result):
+    print(f"{name:<40} {result['median_ms']:10.3f} ms  (min {result['min_ms']:.3f})", flush=True)
+
+
+def limit(name, tolerance):
+    return 1 + max(tolerance, NOISY.get(name, 0))
+
+
+def compare(results, baseline, tolerance):
+    failed = []
+    print()
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<40} new")
+            continue
+        ratio = result["score_ms"] / base["score_ms"]
+        status = "REGRESSION" if ratio > limit(name, tolerance) else "ok"
+        print(f"{name:<40} {ratio:6.2f}x baseline  {status}")
+        if status != "ok":
+            failed.append(name)
+    if failed:
+        print(f"\n{len(failed)} regression(s) over {tolerance:.0%}: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if any(os.environ.get(k) != v for k, v in MALLOC.items()):
+        os.environ.update(MALLOC)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    sys.exit(main())
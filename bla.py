@@ -1,46 +1,16 @@
 
 # Bresenham's line algorithm implementation in Python using Pygame
 
-def bla(x1,y1,x2,y2):
-    dx=abs(x2-x1)
-    dy=abs(y2-y1)
+from gfx.raster import bla_lines
+from gfx.scene import Scene, run
 
-    if(x2>x1):
-        lx=1
-    else:
-        lx=-1
-    if(y2>y1):
-        ly=1
-    else:
-        ly=-1
-    
-    x=x1
-    y=y1
-    
+def bla(x1,y1,x2,y2,surface=None):
+    bla_lines(screen if surface is None else surface,[(x1,y1,x2,y2)],white)
 
-    if(dx>dy):
-        pk=2*dy-dx
-        for i in range(dx):
-            if(pk<0):
-                x=x+lx
-                pk=pk+2*dy
-            else:
-                x=x+lx
-                y=y+ly
-                pk=pk+2*dy-2*dx
-            screen.set_at((x,y),white)
-    else:
-        pk=2*dx-dy
-        for i in range(dy):
-           
-            if(pk<0):
-                y=y+ly
-                pk=pk+2*dx
-            else:
-                y=y+ly
-                x=x+lx
-                pk=pk+2*dx-2*dy
-            screen.set_at((x,y),white)
+# Many lines in one call: lines is an (N,4) array of x1,y1,x2,y2.
+# Lines are clipped to clip (x,y,w,h), or the screen, before drawing.
+def bla_batch(lines,clip=None):
+    bla_lines(screen,lines,white,clip)
 
 import pygame
 import sys
@@ -50,17 +20,10 @@ screen=pygame.display.set_mode((w,h))
 white=(255,255,255)
 black=(0,0,0)
 
-while True:
-    for event in pygame.event.get():
-        if(event.type==pygame.QUIT):
-            pygame.quit()
-            sys.exit()
-    screen.fill(black)
-    bla(100,500,300,100)
-    
-    pygame.display.flip()
-
-
-
-
-    
\ No newline at end of file
+# The line is drawn once into a cached scene; the loop then just waits for
+# events instead of redrawing it every frame.
+scene=Scene((w,h),black)
+scene.add(lambda surface: bla(100,500,300,100,surface))
+run(screen,scene)
+pygame.quit()
+sys.exit()
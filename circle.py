@@ -61,39 +61,46 @@
 
 import pygame
 import sys
+from gfx.transform import translate, draw_edges
+from gfx.tween import Timeline, ease_in_out_quad
+from gfx.profiler import FrameProfiler
 
 pygame.init()
 w,h=1300,675
 screen=pygame.display.set_mode((w,h))
 white=(255,255,255)
 black=(0,0,0)
+FPS=60
 
-def trans(x1,y1,x2,y2):
-    tx=0
-    while(tx<500):
+# The line is kept as a vertex array and moved with a translation matrix,
+# so any number of vertices costs a single matrix product per frame.
+def trans(x1,y1,x2,y2,tx):
+    draw_edges(screen,translate(tx,0),[(x1,y1),(x2,y2)],[(0,1)],black,2)
 
-        x3=x1+tx
-        y3=y1
-        x4=x2+tx
-        y4=y2 
-        tx+=10
-        clock.tick(10)
-        pygame.display.flip() 
-        pygame.draw.line(screen,black,(x3,y3),(x4,y4),2)
+# tx is animated by the timeline, which the main loop advances once per frame
+# with the real frame time, so the loop keeps handling events meanwhile.
+state={'tx':0}
+timeline=Timeline()
+timeline.add(state,'tx',0,490,5.0,ease_in_out_quad,loop=True)
 
+# F3 shows the frame-time overlay
+profiler=FrameProfiler()
 clock = pygame.time.Clock()
 while True:
-    for event in pygame.event.get():
-        if(event.type==pygame.QUIT):
-            pygame.quit()
-            sys.exit()
-    screen.fill(white)
-    pygame.draw.line(screen,black,(100,100),(600,600),2)
-    trans(100,100,600,600)
-    pygame.display.flip()   
-
-
-
-
-
-
+    profiler.frame()
+    with profiler.phase('event'):
+        for event in pygame.event.get():
+            if(event.type==pygame.QUIT):
+                pygame.quit()
+                sys.exit()
+            profiler.handle(event)
+    dt=clock.tick(FPS)/1000
+    with profiler.phase('update'):
+        timeline.update(dt)
+    with profiler.phase('draw'):
+        screen.fill(white)
+        pygame.draw.line(screen,black,(100,100),(600,600),2)
+        trans(100,100,600,600,state['tx'])
+    profiler.draw(screen,(w-260,10))
+    with profiler.phase('flip'):
+        pygame.display.flip()
@@ -0,0 +1 @@
+# Shared helpers for the pygame demos in this repo.
@@ -0,0 +1,123 @@
+# Proximity sound effects on a fixed pool of mixer channels.
+#
+# Sources call trigger() every frame they are within earshot; update() then
+# decides once per frame what actually plays. Only the nearest triggers (by
+# priority first) get a channel. A source whose sound is still playing just
+# has its volume updated rather than being started again, and a sound never
+# restarts for the same source within its cooldown. Volume falls off
+# linearly from full at `near` to silent at `radius`. A sound whose source
+# wasn't triggered this frame (it moved out of earshot, or went away) fades
+# out and frees its channel, unless it was added with follow=False: those
+# are one-shots, triggered once and left to play out.
+
+import pygame
+
+
+class _Effect:
+    __slots__ = ("sound", "radius", "near", "cooldown", "volume", "priority", "follow")
+
+    def __init__(self, sound, radius, near, cooldown, volume, priority, follow):
+        self.sound = sound
+        self.radius = radius
+        self.near = near
+        self.cooldown = cooldown
+        self.volume = volume
+        self.priority = priority
+        self.follow = follow
+
+    def gain(self, distance):
+        if distance <= self.near or self.radius <= self.near:
+            return self.volume
+        return self.volume * max(0.0, (self.radius - distance) / (self.radius - self.near))
+
+
+class AudioManager:
+    def __init__(self, channels=4, fade=150):
+        # The first `channels` mixer channels are reserved for the manager,
+        # so Sound.play() elsewhere can't take them. fade is in ms.
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [None] * channels  # (source, name, distance) per channel
+        self.effects = {}
+        self.started = {}  # (source, name) -> when it last started, in ms
+        self.pending = {}
+        self.fade = fade
+
+    def add(self, name, sound, radius, near=0, cooldown=1000, volume=1.0, priority=0, follow=True):
+        # cooldown is in ms; higher priority sounds win a channel first.
+        # follow=False makes a one-shot that keeps playing at the volume it
+        # started with after its trigger stops.
+        self.effects[name] = _Effect(sound, radius, near, cooldown, volume, priority, follow)
+
+    def trigger(self, source, name, distance):
+        effect = self.effects.get(name)
+        if effect is None or distance >= effect.radius:
+            return
+        key = (source, name)
+        if distance < self.pending.get(key, distance + 1):
+            self.pending[key] = distance
+
+    def update(self, now=None):
+        now = pygame.time.get_ticks() if now is None else now
+        voices = self.voices
+        pending = self.pending
+        self.pending = {}
+        for i, channel in enumerate(self.channels):
+            if voices[i] is None:
+                continue
+            if not channel.get_busy():
+                voices[i] = None
+            elif voices[i][:2] not in pending and self.effects[voices[i][1]].follow:
+                channel.fadeout(self.fade)
+                voices[i] = None
+        playing = {(v[0], v[1]): i for i, v in enumerate(voices) if v is not None}
+
+        wanted = sorted(pending.items(), key=lambda kv: self._rank(kv[0][1], kv[1]))
+        taken = set()
+        for (source, name), distance in wanted[:len(self.channels)]:
+            effect = self.effects[name]
+            i = playing.get((source, name))
+            if i is None:
+                if now - self.started.get((source, name), -effect.cooldown) < effect.cooldown:
+                    continue
+                i = self._free_channel(self._rank(name, distance), taken)
+                if i is None:
+                    continue
+                if voices[i] is not None:
+                    del playing[voices[i][:2]]
+                self.channels[i].play(effect.sound)
+                self.started[(source, name)] = now
+            self.channels[i].set_volume(effect.gain(distance))
+            voices[i] = (source, name, distance)
+            taken.add(i)
+
+        # Still triggered but outranked this frame, and not stolen: keep
+        # their volume and rank current too
+        for key, i in playing.items():
+            if i not in taken and key in pending:
+                distance = pending[key]
+                self.channels[i].set_volume(self.effects[key[1]].gain(distance))
+                voices[i] = key + (distance,)
+
+    def _rank(self, name, distance):
+        # Lower ranks get channels first
+        return -self.effects[name].priority, distance
+
+    def _free_channel(self, rank, taken):
+        # An idle channel, or else the one playing the lowest-ranked voice if
+        # it ranks below the new one (and wasn't given out this frame)
+        worst, worst_rank = None, rank
+        for i, voice in enumerate(self.voices):
+            if voice is None:
+                return i
+            r = self._rank(voice[1], voice[2])
+            if i not in taken and r > worst_rank:
+                worst, worst_rank = i, r
+        return worst
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+        self.voices = [None] * len(self.channels)
@@ -0,0 +1,91 @@
+# Depth-tested sprites for the raycaster.
+#
+# draw_sprites() projects every sprite, drops those that are off-screen or
+# entirely behind the walls (tested against the per-column depth buffer the
+# wall cast leaves behind) and draws the rest back to front, blitting only
+# the column runs that are in front of the wall. Scaling happens last and
+# goes through ScaleCache, which snaps heights into buckets so a sprite is
+# resized once per bucket rather than once per frame.
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class ScaleCache:
+    def __init__(self, surface, ratio=1 / 16, min_step=2, size=64):
+        # Heights are snapped to steps of about ratio of themselves (but at
+        # least min_step pixels); the size least recently used are kept.
+        self.surface = surface
+        self.aspect = surface.get_width() / surface.get_height()
+        self.ratio = ratio
+        self.min_step = min_step
+        self.size = size
+        self.frames = OrderedDict()
+
+    def bucket(self, height):
+        step = max(self.min_step, int(height * self.ratio))
+        return max(step, (height + step // 2) // step * step)
+
+    def get(self, height):
+        # height must already be a bucket
+        frame = self.frames.get(height)
+        if frame is not None:
+            self.frames.move_to_end(height)
+            return frame
+        width = max(1, round(height * self.aspect))
+        frame = self.frames[height] = pygame.transform.scale(self.surface, (width, height))
+        if len(self.frames) > self.size:
+            self.frames.popitem(last=False)
+        return frame
+
+
+def _runs(mask):
+    # (start, stop) of each run of True in a 1D bool array
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    return edges[::2].tolist(), edges[1::2].tolist()
+
+
+def draw_sprites(surface, sprites, zbuf, px, py, angle, fov, tile):
+    # sprites is a list of (x, y, ScaleCache); zbuf holds the wall depth of
+    # every screen column. Returns, per sprite, its distance from the viewer
+    # if it is on screen (even if hidden behind a wall) and None otherwise.
+    w, h = surface.get_size()
+    dist_proj = (w / 2) / math.tan(fov / 2)
+    out = [None] * len(sprites)
+    if not sprites:
+        return out
+
+    xy = np.array([(x, y) for x, y, _ in sprites], dtype=float)
+    dx, dy = xy[:, 0] - px, xy[:, 1] - py
+    dist = np.hypot(dx, dy)
+    gamma = (np.arctan2(dy, dx) - angle + math.pi) % (2 * math.pi) - math.pi
+    depth = dist * np.cos(gamma)  # same fisheye correction as the walls
+    ahead = depth > 1e-6
+    with np.errstate(divide="ignore", invalid="ignore"):
+        size = np.minimum(dist_proj * tile / (depth + 0.01), h)
+        center = w / 2 + np.tan(gamma) * dist_proj
+
+    order = np.argsort(-depth)  # back to front
+    draws = []
+    for i in order[ahead[order]].tolist():
+        cache = sprites[i][2]
+        sh = cache.bucket(int(size[i]))
+        sw = max(1, round(sh * cache.aspect))
+        left = int(center[i]) - sw // 2
+        x0, x1 = max(left, 0), min(left + sw, w)
+        if x0 >= x1:
+            continue
+        out[i] = float(dist[i])
+        visible = depth[i] < zbuf[x0:x1]
+        if not visible.any():
+            continue
+        frame = cache.get(sh)
+        top = h // 2 - sh // 2
+        for a, b in zip(*_runs(visible)):
+            draws.append((frame, (x0 + a, top), pygame.Rect(x0 + a - left, 0, b - a, sh)))
+    if draws:
+        surface.blits(draws, doreturn=False)
+    return out
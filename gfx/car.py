@@ -0,0 +1,90 @@
+# Car physics for project.py, free of pygame so it can run headless.
+#
+# The handling numbers were tuned as "per frame at 60 FPS", so a tick of
+# 1/60 s applies them exactly as before and other dt values scale them.
+
+import math
+from collections import namedtuple
+
+TICK = 1 / 60
+
+# What the driver is pressing on one tick
+CarInput = namedtuple("CarInput", "up down left right")
+IDLE = CarInput(False, False, False, False)
+
+
+class CarParams:
+    def __init__(self, acceleration=0.15, friction=0.04, max_speed=10, steering=3.5):
+        self.acceleration = acceleration
+        self.friction = friction
+        self.max_speed = max_speed
+        self.steering = steering
+
+
+class CarState:
+    __slots__ = ("x", "y", "angle", "speed")
+
+    def __init__(self, x, y, angle=0.0, speed=0.0):
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.speed = speed
+
+    def copy(self):
+        return CarState(self.x, self.y, self.angle, self.speed)
+
+    def lerp(self, other, t):
+        return CarState(self.x + (other.x - self.x) * t,
+                        self.y + (other.y - self.y) * t,
+                        self.angle + (other.angle - self.angle) * t,
+                        self.speed + (other.speed - self.speed) * t)
+
+
+def step(state, inp, params, dt=TICK):
+    # Advance one tick and return the new state; state is left untouched.
+    k = dt / TICK
+    speed = state.speed
+    angle = state.angle
+
+    # Acceleration / Braking
+    if inp.up:
+        speed += params.acceleration * k
+    elif inp.down:
+        speed -= params.acceleration * k
+    else:
+        # Apply friction when no key is pressed
+        if speed > 0: speed -= params.friction * k
+        elif speed < 0: speed += params.friction * k
+
+    # Limit speed
+    speed = max(-params.max_speed / 2, min(speed, params.max_speed))
+
+    # Steering (Only steer if the car is moving)
+    if abs(speed) > 0.1:
+        direction = 1 if speed > 0 else -1
+        if inp.left:
+            angle += params.steering * direction * k
+        if inp.right:
+            angle -= params.steering * direction * k
+
+    # The car sprite points up, so angle 0 moves towards -y
+    radians = math.radians(angle)
+    x = state.x + speed * math.sin(radians) * k
+    y = state.y - speed * math.cos(radians) * k
+    return CarState(x, y, angle, speed)
+
+
+def simulate(state, inputs, params=None, dt=TICK, ticks=None):
+    # Run the car without a display, as fast as the CPU allows. inputs is
+    # either a sequence of CarInput (one per tick) or a callable
+    # inputs(tick, state) -> CarInput. Returns the final state.
+    params = params or CarParams()
+    if callable(inputs):
+        for t in range(ticks):
+            state = step(state, inputs(t, state), params, dt)
+    else:
+        for t, inp in enumerate(inputs):
+            if ticks is not None and t >= ticks:
+                break
+            state = step(state, inp, params, dt)
+    return state
@@ -0,0 +1,18 @@
+# Command-line options for the demo scripts and the benchmark.
+#
+# The scripts take a handful of `--name VALUE` options and bare `--flag`s
+# straight from sys.argv. arg() reads an option's value, falling back to the
+# default when the option is missing or is the last argument, or when what
+# follows it is another option.
+
+import sys
+
+
+def arg(name, default=None, argv=None):
+    argv = sys.argv if argv is None else argv
+    if name not in argv:
+        return default
+    i = argv.index(name)
+    if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
+        return argv[i + 1]
+    return default
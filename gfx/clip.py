@@ -0,0 +1,80 @@
+# Line clipping against an axis-aligned rect, vectorized over (N,4) arrays of
+# x1,y1,x2,y2 segments. Rects are pygame style (x, y, w, h).
+#
+# Cohen-Sutherland outcodes accept or reject most segments outright; the rest
+# go through Liang-Barsky, which gives the visible part as a range [t0, t1]
+# of the segment's parameter.
+
+import numpy as np
+
+INSIDE = 0
+LEFT = 1
+RIGHT = 2
+BOTTOM = 4
+TOP = 8
+
+
+def bounds(rect, margin=0.0):
+    x, y, w, h = rect
+    return x - margin, y - margin, x + w - 1 + margin, y + h - 1 + margin
+
+
+def outcodes(x, y, rect, margin=0.0):
+    xmin, ymin, xmax, ymax = bounds(rect, margin)
+    code = np.zeros(np.shape(x), dtype=np.int8)
+    code |= np.where(x < xmin, LEFT, INSIDE).astype(np.int8)
+    code |= np.where(x > xmax, RIGHT, INSIDE).astype(np.int8)
+    code |= np.where(y < ymin, TOP, INSIDE).astype(np.int8)
+    code |= np.where(y > ymax, BOTTOM, INSIDE).astype(np.int8)
+    return code
+
+
+def clip_params(lines, rect, margin=0.0):
+    # Returns t0, t1 and a visible mask for every segment. margin grows the
+    # rect on all sides, which rasterizers use so that pixels rounded onto
+    # the edge are not lost.
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    x1, y1, x2, y2 = lines.T
+    n = lines.shape[0]
+    t0 = np.zeros(n)
+    t1 = np.ones(n)
+
+    c1 = outcodes(x1, y1, rect, margin)
+    c2 = outcodes(x2, y2, rect, margin)
+    reject = (c1 & c2) != 0
+    partial = ~reject & ((c1 | c2) != 0)
+    visible = ~reject
+
+    if partial.any():
+        xmin, ymin, xmax, ymax = bounds(rect, margin)
+        px1, py1 = x1[partial], y1[partial]
+        dx = x2[partial] - px1
+        dy = y2[partial] - py1
+        lo = np.zeros(px1.size)
+        hi = np.ones(px1.size)
+        ok = np.ones(px1.size, dtype=bool)
+        for p, q in ((-dx, px1 - xmin), (dx, xmax - px1),
+                     (-dy, py1 - ymin), (dy, ymax - py1)):
+            flat = p == 0
+            ok &= ~(flat & (q < 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = q / p
+            lo = np.where(~flat & (p < 0), np.maximum(lo, r), lo)
+            hi = np.where(~flat & (p > 0), np.minimum(hi, r), hi)
+        t0[partial] = lo
+        t1[partial] = hi
+        visible[partial] = ok & (lo <= hi)
+
+    return t0, t1, visible
+
+
+def clip_lines(lines, rect):
+    # The visible part of every segment as float endpoints, plus the mask of
+    # segments that have one. Rejected segments are left out.
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+    t0, t1, visible = clip_params(lines, rect)
+    x1, y1, x2, y2 = lines[visible].T
+    t0, t1 = t0[visible], t1[visible]
+    dx, dy = x2 - x1, y2 - y1
+    out = np.stack((x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy), axis=1)
+    return out, visible
@@ -0,0 +1,43 @@
+# Dirty-rect presentation over a pre-rendered static background.
+#
+# Static scenery is drawn once into a background surface. Each frame,
+# restore() paints the background back over whatever was drawn on the last
+# frame, the caller draws the moving parts and mark()s the rects it touched,
+# and update() pushes only those regions (old and new) to the display.
+
+import pygame
+
+
+class DirtyRects:
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.last = []
+        self.now = []
+        self.full = True
+
+    def invalidate(self):
+        # Redraw and present the whole screen on the next frame
+        self.full = True
+
+    def restore(self):
+        if self.full:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            blit = self.screen.blit
+            for r in self.last:
+                blit(self.background, r, r)
+
+    def mark(self, *rects):
+        for r in rects:
+            if r:
+                self.now.append(pygame.Rect(r))
+
+    def update(self):
+        if self.full:
+            pygame.display.flip()
+            self.full = False
+        else:
+            pygame.display.update(self.last + self.now)
+        self.last = self.now
+        self.now = []
@@ -0,0 +1,61 @@
+# Many McLarenCar physics models at once, stored as arrays.
+#
+# Fleet keeps x, y, angle and speed as NumPy arrays and applies the rules of
+# gfx.car.step to every car in one vectorized tick. Inputs are boolean arrays
+# with one entry per car. The result matches running gfx.car.step on each car
+# on its own.
+
+import numpy as np
+
+from gfx.car import TICK, CarParams, CarState
+
+
+class Fleet:
+    def __init__(self, n, x=0.0, y=0.0, angle=0.0, speed=0.0, params=None):
+        self.params = params or CarParams()
+        self.x = np.full(n, x, dtype=np.float64)
+        self.y = np.full(n, y, dtype=np.float64)
+        self.angle = np.full(n, angle, dtype=np.float64)
+        self.speed = np.full(n, speed, dtype=np.float64)
+
+    def __len__(self):
+        return self.x.size
+
+    @classmethod
+    def from_states(cls, states, params=None):
+        fleet = cls(len(states), params=params)
+        for i, s in enumerate(states):
+            fleet.x[i], fleet.y[i], fleet.angle[i], fleet.speed[i] = s.x, s.y, s.angle, s.speed
+        return fleet
+
+    def state(self, i):
+        return CarState(float(self.x[i]), float(self.y[i]), float(self.angle[i]), float(self.speed[i]))
+
+    def step(self, up, down, left, right, dt=TICK):
+        # Same rules, in the same order, as gfx.car.step
+        p = self.params
+        k = dt / TICK
+        up = np.asarray(up, dtype=bool)
+        down = np.asarray(down, dtype=bool) & ~up
+        coast = ~(up | down)
+        speed = self.speed
+
+        speed = np.where(up, speed + p.acceleration * k, speed)
+        speed = np.where(down, speed - p.acceleration * k, speed)
+        speed = np.where(coast & (speed > 0), speed - p.friction * k,
+                         np.where(coast & (speed < 0), speed + p.friction * k, speed))
+
+        speed = np.maximum(-p.max_speed / 2, np.minimum(speed, p.max_speed))
+
+        moving = np.abs(speed) > 0.1
+        direction = np.where(speed > 0, 1, -1)
+        turn = p.steering * direction * k
+        angle = self.angle
+        angle = np.where(moving & left, angle + turn, angle)
+        angle = np.where(moving & right, angle - turn, angle)
+
+        radians = np.radians(angle)
+        self.x = self.x + speed * np.sin(radians) * k
+        self.y = self.y - speed * np.cos(radians) * k
+        self.angle = angle
+        self.speed = speed
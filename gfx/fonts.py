@@ -0,0 +1,41 @@
+# Font registry and rendered-text cache for HUDs.
+#
+# SysFont does a system font lookup every time it is called, so fonts are
+# loaded once per (face, size, bold, italic) and kept. Rendered text is cached
+# by (text, font, color, antialias), so a HUD line is only rendered again
+# when its value actually changes.
+
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+_texts = OrderedDict()
+TEXT_CACHE_SIZE = 256
+
+
+def get_font(face, size, bold=False, italic=False):
+    key = (face, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.SysFont(face, size, bold, italic)
+    return font
+
+
+def render_text(text, font, color, antialias=True):
+    key = (text, font, tuple(color), antialias)
+    surf = _texts.get(key)
+    if surf is not None:
+        _texts.move_to_end(key)
+        return surf
+    surf = _texts[key] = font.render(text, antialias, color)
+    if len(_texts) > TEXT_CACHE_SIZE:
+        _texts.popitem(last=False)
+    return surf
+
+
+def clear():
+    _fonts.clear()
+    _texts.clear()
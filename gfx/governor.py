@@ -0,0 +1,63 @@
+# Frame-time governor for adaptive render resolution.
+#
+# Each frame reports how long its rendering took; the governor keeps a
+# running average and moves between a fixed set of resolution scales to keep
+# that average under the target. Going down happens as soon as the average
+# is over budget; going up only once the next scale is predicted to fit
+# (cost grows with the pixel count, i.e. scale squared) with some headroom.
+# After every change it waits a few frames so the average reflects the new
+# scale before deciding again.
+
+import time
+
+
+class ResolutionGovernor:
+    def __init__(self, target, min_scale=0.25, max_scale=1.0, levels=8,
+                 smoothing=0.1, headroom=0.8, settle=15):
+        # target is the render budget per frame in seconds; the scales are
+        # spread evenly from max_scale down to min_scale.
+        self.target = target
+        step = (max_scale - min_scale) / max(1, levels - 1)
+        self.scales = [max_scale - i * step for i in range(levels)]
+        self.level = 0
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.settle = settle
+        self.average = None
+        self.wait = settle
+        self.started = None
+
+    @property
+    def scale(self):
+        return self.scales[self.level]
+
+    def size(self, width, height):
+        # Internal render size for a window of width x height
+        s = self.scale
+        return max(1, round(width * s)), max(1, round(height * s))
+
+    def begin(self):
+        self.started = time.perf_counter()
+
+    def end(self):
+        self.measure(time.perf_counter() - self.started)
+
+    def measure(self, seconds):
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += (seconds - self.average) * self.smoothing
+        if self.wait > 0:
+            self.wait -= 1
+            return
+        if self.average > self.target and self.level < len(self.scales) - 1:
+            self._move(1)
+        elif self.level > 0:
+            grow = (self.scales[self.level - 1] / self.scale) ** 2
+            if self.average * grow < self.target * self.headroom:
+                self._move(-1)
+
+    def _move(self, by):
+        self.level += by
+        self.average = None
+        self.wait = self.settle
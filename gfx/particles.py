@@ -0,0 +1,82 @@
+# Fixed-capacity particle pool for fading wake trails.
+#
+# Particles live in NumPy arrays (position, alpha, size) inside a ring buffer,
+# so emitting never allocates and fading is one array op per frame. Each
+# (size, alpha) look is rendered once into a small stamp surface that every
+# particle and every pool reuses.
+
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+
+@lru_cache(maxsize=None)
+def stamp(size, alpha, color=(255, 255, 255)):
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(surf, (*color[:3], alpha), (size // 2, size // 2), size // 2)
+    return surf
+
+
+class ParticlePool:
+    def __init__(self, capacity=128, fade=4, sizes=(5, 10), emit_every=1,
+                 color=(255, 255, 255), start_alpha=255, rng=None):
+        # sizes is the inclusive range particle sizes are drawn from; a
+        # particle is emitted on one call to emit() out of every emit_every.
+        self.capacity = capacity
+        self.fade = fade
+        self.sizes = sizes
+        self.emit_every = emit_every
+        self.color = tuple(color)
+        self.start_alpha = start_alpha
+        self.rng = rng or np.random.default_rng()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.alpha = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.head = 0
+        self.calls = 0
+
+        # Every alpha a particle can have, from the first fade step down
+        levels = range(start_alpha, 0, -fade)
+        self.stamps = {(s, a): stamp(s, a, self.color)
+                       for s in range(sizes[0], sizes[1] + 1) for a in levels}
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alpha > 0))
+
+    def emit(self, x, y):
+        self.calls += 1
+        if (self.calls - 1) % self.emit_every:
+            return
+        # When the pool is full the oldest particle is reused
+        i = self.head
+        self.head = (i + 1) % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.alpha[i] = self.start_alpha
+        self.size[i] = self.rng.integers(self.sizes[0], self.sizes[1] + 1)
+
+    def update(self):
+        live = self.alpha > 0
+        self.alpha[live] -= self.fade
+        np.maximum(self.alpha, 0, out=self.alpha)
+
+    def draw(self, screen):
+        # Returns the rect covering every particle drawn, or None
+        live = np.flatnonzero(self.alpha > 0)
+        if live.size == 0:
+            return None
+        # oldest first, so newer particles are drawn on top as before
+        live = np.roll(live, -int(np.searchsorted(live, self.head)))
+        size = self.size[live]
+        left = self.x[live] - size // 2
+        top = self.y[live] - size // 2
+        stamps = self.stamps
+        screen.blits([(stamps[(s, a)], (l, t)) for s, a, l, t in
+                      zip(size.tolist(), self.alpha[live].tolist(), left.tolist(), top.tolist())],
+                     doreturn=False)
+        x0, y0 = int(left.min()), int(top.min())
+        x1, y1 = int((left + size).max()) + 1, int((top + size).max()) + 1
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
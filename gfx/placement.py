@@ -0,0 +1,65 @@
+# Seeded placement of objects on the set pixels of a mask.
+#
+# water_index() flattens the mask once into an array of set-pixel offsets.
+# After that a uniformly random valid position is a single random index
+# instead of rejection sampling over the whole screen.
+
+import numpy as np
+import pygame
+
+
+class PixelIndex:
+    def __init__(self, offsets, width):
+        self.offsets = offsets
+        self.width = width
+
+    def __len__(self):
+        return self.offsets.size
+
+    def positions(self, picks):
+        flat = self.offsets[picks]
+        return np.stack((flat % self.width, flat // self.width), axis=1)
+
+
+def water_index(mask):
+    w, h = mask.get_size()
+    set_pixels = pygame.surfarray.array_red(mask.to_surface()) > 0
+    return PixelIndex(np.flatnonzero(set_pixels.T), w)
+
+
+def place(index, n, rng, min_spacing=0, batch=4):
+    # n positions from index, at least min_spacing apart. Candidates are drawn
+    # in bulk and checked against a grid of accepted points, so each one
+    # costs O(1). Returns fewer than n if the area is too crowded to fit them.
+    if not min_spacing:
+        return index.positions(rng.integers(0, len(index), n))
+
+    cell = min_spacing / np.sqrt(2)
+    taken = {}
+    out = []
+    reach = 2
+    spacing2 = min_spacing * min_spacing
+    for _ in range(50):
+        for x, y in index.positions(rng.integers(0, len(index), n * batch)).tolist():
+            cx, cy = int(x // cell), int(y // cell)
+            ok = True
+            for i in range(cx - reach, cx + reach + 1):
+                for j in range(cy - reach, cy + reach + 1):
+                    p = taken.get((i, j))
+                    if p and (p[0] - x) ** 2 + (p[1] - y) ** 2 < spacing2:
+                        ok = False
+                        break
+                if not ok:
+                    break
+            if ok:
+                taken[(cx, cy)] = (x, y)
+                out.append((x, y))
+                if len(out) == n:
+                    return np.array(out)
+    return np.array(out).reshape(-1, 2)
+
+
+def layouts(index, count, n, seed, min_spacing=0):
+    # count reproducible layouts; layout i only depends on seed and i
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [place(index, n, np.random.default_rng(child), min_spacing) for child in children]
@@ -0,0 +1,178 @@
+# Per-phase frame timing with an on-screen graph.
+#
+# A loop calls frame() once per frame and wraps its phases in
+# `with profiler.phase("draw"):`. Each frame's total time and per-phase
+# times go into a ring buffer for rolling percentiles and, when a CSV path
+# is given, are written out one row per frame. While the profiler is off,
+# phase() hands back a shared do-nothing context and frame() returns at
+# once, so leaving the calls in a loop costs next to nothing.
+#
+# F3 (handled by handle()) shows or hides the overlay, switching timing on
+# with it.
+
+import csv
+import time
+
+import numpy as np
+import pygame
+
+from gfx.fonts import get_font, render_text
+
+PHASES = ("event", "update", "draw", "flip")
+# Graph colours per phase, then the rest of the frame (mostly waiting)
+COLORS = [(90, 160, 255), (120, 220, 120), (255, 170, 60), (220, 90, 200),
+          (230, 230, 90), (90, 220, 220)]
+REST_COLOR = (110, 110, 110)
+BACKGROUND = (16, 16, 16)
+BUDGET_COLOR = (255, 60, 60)
+
+
+class _Off:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_OFF = _Off()
+
+
+class _Timer:
+    __slots__ = ("times", "i", "start")
+
+    def __init__(self, times, i):
+        self.times = times
+        self.i = i
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.times[self.i] += time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, phases=PHASES, history=600, enabled=False, csv_path=None,
+                 budget=1 / 60, key=pygame.K_F3):
+        # budget is the frame time the graph marks with a line
+        self.phases = tuple(phases)
+        self.history = history
+        self.budget = budget
+        self.key = key
+        # column 0 is the whole frame, then one per phase, in seconds
+        self.samples = np.zeros((history, len(self.phases) + 1))
+        self.count = 0
+        self.times = [0.0] * len(self.phases)
+        self.timers = {name: _Timer(self.times, i) for i, name in enumerate(self.phases)}
+        self.started = None
+        self.show = False
+        self.file = None
+        self.writer = None
+        if csv_path:
+            self.file = open(csv_path, "w", newline="")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["frame", "total_ms"] + [f"{p}_ms" for p in self.phases])
+        self.enabled = enabled or self.writer is not None
+        self.text = []
+        self.text_at = -1
+
+    def phase(self, name):
+        if not self.enabled:
+            return _OFF
+        return self.timers[name]
+
+    def frame(self):
+        # Call at the top of every frame; closes the previous one
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.started is not None:
+            row = self.samples[self.count % self.history]
+            row[0] = now - self.started
+            row[1:] = self.times
+            if self.writer is not None:
+                self.writer.writerow([self.count] + [f"{t * 1000:.3f}" for t in row.tolist()])
+            self.count += 1
+        for i in range(len(self.times)):
+            self.times[i] = 0.0
+        self.started = now
+
+    def recent(self):
+        # The buffered samples, oldest first
+        n = min(self.count, self.history)
+        return np.roll(self.samples, -(self.count % self.history), axis=0)[self.history - n:]
+
+    def percentiles(self, q=(50, 95, 99)):
+        # {"frame": [...], phase: [...]} in milliseconds over the buffer
+        recent = self.recent()
+        if not len(recent):
+            return {}
+        values = np.percentile(recent, q, axis=0).T * 1000
+        return dict(zip(("frame",) + self.phases, values.tolist()))
+
+    def handle(self, event):
+        # Returns True if the event was the overlay key
+        if event.type == pygame.KEYDOWN and event.key == self.key:
+            self.show = not self.show
+            self.enabled = self.show or self.writer is not None
+            if not self.enabled:
+                self.started = None
+            return True
+        return False
+
+    def draw(self, surface, pos=(10, 10), size=(240, 80)):
+        # The frame-time graph (phases stacked per frame, newest on the
+        # right) with percentile text under it. Returns the rect drawn, or
+        # None while the overlay is hidden.
+        if not self.show:
+            return None
+        w, h = size
+        recent = self.recent()[-w:] * 1000
+        panel = pygame.Surface((w, h))
+        pixels = pygame.surfarray.pixels3d(panel)
+        pixels[...] = BACKGROUND
+        if len(recent):
+            scale = h / (2 * self.budget * 1000)  # the graph tops out at 2x budget
+            stack = np.cumsum(recent[:, 1:], axis=1) * scale
+            total = recent[:, 0] * scale
+            level = np.arange(h - 1, -1, -1)[None, :, None]
+            bars = np.concatenate((stack, total[:, None]), axis=1)[:, None, :]
+            band = (level >= bars).sum(axis=2)  # 0 = first phase ... n + 1 = above
+            colors = np.array(COLORS[:len(self.phases)] + [REST_COLOR, BACKGROUND], dtype=np.uint8)
+            pixels[w - len(recent):] = colors[band]
+            pixels[:, h - 1 - min(h - 1, int(self.budget * 1000 * scale))] = BUDGET_COLOR
+        del pixels
+
+        # The text only changes twice a second or so, which keeps the font
+        # cache from churning
+        if self.count // 30 != self.text_at:
+            self.text_at = self.count // 30
+            font = get_font("Consolas", 13)
+            stats = self.percentiles()
+            self.text = []
+            if stats:
+                p50, p95, p99 = stats["frame"]
+                lines = [f"frame p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms"]
+                lines += [f"{name:<7} p50 {stats[name][0]:.2f}  p95 {stats[name][1]:.2f} ms"
+                          for name in self.phases]
+                self.text = [render_text(line, font, (255, 255, 255)) for line in lines]
+
+        x, y = pos
+        rect = surface.blit(panel, pos)
+        y += h
+        for line in self.text:
+            text_rect = line.get_rect(topleft=(x, y))
+            surface.fill(BACKGROUND, text_rect.inflate(4, 0))
+            rect.union_ip(surface.blit(line, text_rect))
+            y += line.get_height()
+        return rect.inflate(4, 0)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = self.writer = None
@@ -0,0 +1,168 @@
+# Racing line and steering field for CPU drivers.
+#
+# The track's waypoints are turned once into a densely sampled closed racing
+# line, and every cell of a grid over the screen stores the heading that
+# points at the line a little way ahead of the nearest point on it. Steering
+# a CPU boat is then a single grid lookup per frame.
+
+import math
+
+import numpy as np
+
+
+def _smooth(points, rounds=3):
+    # Chaikin corner cutting, so the line rounds the waypoints off
+    p = np.asarray(points, dtype=np.float64)
+    for _ in range(rounds):
+        q = np.roll(p, -1, axis=0)
+        p = np.stack((0.75 * p + 0.25 * q, 0.25 * p + 0.75 * q), axis=1).reshape(-1, 2)
+    return p
+
+
+def heading_to(dx, dy):
+    # Boat angle (degrees) that moves along (dx, dy): a boat with angle a
+    # moves along (-sin a, -cos a)
+    return np.degrees(np.arctan2(-dx, -dy))
+
+
+class RacingLine:
+    def __init__(self, points, size, cell=10, spacing=4.0, lookahead=60.0):
+        line = _smooth(points)
+        seg = np.roll(line, -1, axis=0) - line
+        seg_len = np.hypot(seg[:, 0], seg[:, 1])
+        arc = np.concatenate(([0.0], np.cumsum(seg_len)))
+        self.length = arc[-1]
+
+        # Resample at even spacing so indices are distances along the line
+        s = np.arange(0, self.length, spacing)
+        k = np.searchsorted(arc, s, side="right") - 1
+        t = (s - arc[k]) / seg_len[k]
+        self.samples = line[k] + seg[k] * t[:, None]
+        self.spacing = spacing
+
+        w, h = size
+        self.cell = cell
+        self.cols = -(-w // cell)
+        self.rows = -(-h // cell)
+        cx = (np.arange(self.cols) + 0.5) * cell
+        cy = (np.arange(self.rows) + 0.5) * cell
+        gx, gy = np.meshgrid(cx, cy, indexing="ij")
+        centers = np.stack((gx.ravel(), gy.ravel()), axis=1)
+
+        # nearest sample for every cell, done in chunks to bound memory
+        nearest = np.empty(len(centers), dtype=np.int64)
+        for a in range(0, len(centers), 4096):
+            d = centers[a:a + 4096, None, :] - self.samples[None, :, :]
+            nearest[a:a + 4096] = np.argmin((d * d).sum(-1), axis=1)
+
+        ahead = (nearest + int(round(lookahead / spacing))) % len(self.samples)
+        target = self.samples[ahead] - centers
+        self.field = heading_to(target[:, 0], target[:, 1]).reshape(self.cols, self.rows).astype(np.float32)
+
+    def heading(self, x, y):
+        i = min(max(int(x // self.cell), 0), self.cols - 1)
+        j = min(max(int(y // self.cell), 0), self.rows - 1)
+        return float(self.field[i, j])
+
+    def point_at(self, distance):
+        # Position and heading on the line `distance` along from its start
+        n = len(self.samples)
+        i = int(round(distance / self.spacing)) % n
+        d = self.samples[(i + 1) % n] - self.samples[i]
+        return self.samples[i], float(heading_to(d[0], d[1]))
+
+
+class LineFollower:
+    # Drives a boat along a RacingLine by pressing the same controls a
+    # player would: returns {'up', 'down', 'left', 'right', 'boost'} -> bool.
+    # One per boat; the RacingLine itself is shared.
+    #
+    # blocked(x, y), if given, returns the position of the hazard covering
+    # that point, or None. The driver probes a few points ahead along where
+    # it wants to go (further the faster it goes) and swerves to the nearest
+    # clear heading. If the boat is already on a hazard it backs or drives
+    # straight out, whichever points away from the hazard. A boat that stays
+    # stopped anyway backs off for a moment before carrying on.
+    def __init__(self, line, blocked=None, deadband=4.0, brake_angle=70.0,
+                 boost_angle=8.0, probe=(45.0, 110.0), swerve=(25.0, 50.0, 75.0, 100.0),
+                 stuck_frames=30, reverse_frames=40):
+        # probe is the (min, max) look-ahead; swerve the heading changes
+        # tried, each to both sides
+        self.line = line
+        self.blocked = blocked
+        self.probe = probe
+        self.swerve = swerve
+        self.deadband = deadband
+        self.brake_angle = brake_angle
+        self.boost_angle = boost_angle
+        self.stuck_frames = stuck_frames
+        self.reverse_frames = reverse_frames
+        self.stopped = 0
+        self.reversing = 0
+        self.side = 1  # the way it last swerved, tried first next time
+
+    def _clear(self, x, y, heading, reach):
+        a = math.radians(heading)
+        dx, dy = -math.sin(a), -math.cos(a)
+        for k in (0.25, 0.5, 0.75, 1.0):
+            if self.blocked(x + dx * reach * k, y + dy * reach * k):
+                return False
+        return True
+
+    def press(self, x, y, angle, speed):
+        target = self.line.heading(x, y)
+        braking = False
+        if self.blocked:
+            hazard = self.blocked(x, y)
+            if hazard is not None:
+                # On top of a hazard: too slow to steer, so go straight out
+                # forwards or backwards, whichever leaves it
+                away = float(heading_to(x - hazard[0], y - hazard[1]))
+                off = (away - angle + 180) % 360 - 180
+                self.stopped = 0
+                self.reversing = 0
+                forward = abs(off) < 90
+                return {'up': forward, 'down': not forward,
+                        'left': forward == (off > 0), 'right': forward == (off < 0),
+                        'boost': False}
+            lo, hi = self.probe
+            reach = min(hi, max(lo, abs(speed) * 15))
+            if not self._clear(x, y, target, reach):
+                for turn in self.swerve:
+                    side = next((d for d in (self.side, -self.side)
+                                 if self._clear(x, y, target + d * turn, reach)), None)
+                    if side is not None:
+                        target += side * turn
+                        self.side = side
+                        break
+            # Heading for a hazard: brake to turn tighter, or if it's too
+            # close for that back off, turning as it goes (unless that's
+            # blocked too)
+            braking = speed > 2 and not self._clear(x, y, angle, reach)
+            if not self._clear(x, y, angle + 180, lo / 2):
+                self.reversing = 0
+            elif not self._clear(x, y, angle, lo / 2):
+                self.reversing = max(self.reversing, 1)
+        error = (target - angle + 180) % 360 - 180
+
+        if self.reversing:
+            self.reversing -= 1
+            # steering is mirrored in reverse, so this swings the nose
+            # towards the line
+            return {'up': False, 'down': True, 'left': error < 0,
+                    'right': error > 0, 'boost': False}
+        self.stopped = self.stopped + 1 if abs(speed) < 0.5 else 0
+        if self.stopped > self.stuck_frames:
+            self.stopped = 0
+            self.reversing = self.reverse_frames
+
+        # A boat only turns while moving, so a slow one keeps going even when
+        # it's facing the wrong way
+        turn = abs(error) > self.deadband
+        return {
+            'up': (abs(error) < self.brake_angle or speed < 1) and not braking,
+            'down': braking,
+            'left': turn and error > 0,
+            'right': turn and error < 0,
+            'boost': abs(error) < self.boost_angle,
+        }
@@ -0,0 +1,202 @@
+# Batched NumPy rasterizers that write straight into a surface's pixel buffer.
+#
+# Lines are passed as an (N,4) array of x1,y1,x2,y2 integer endpoints. Every
+# line is clipped to the surface's clip rect (or a rect passed in) before any
+# of its pixels are generated, so off-screen runs cost nothing.
+
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from gfx.clip import clip_params
+
+
+def as_lines(lines):
+    lines = np.asarray(lines, dtype=np.int64)
+    return lines.reshape(-1, 4)
+
+
+def pixel_view(surface, color):
+    # A writable array view of the surface and color in that view's format.
+    try:
+        return pygame.surfarray.pixels2d(surface), surface.map_rgb(color)
+    except ValueError:
+        # 24-bit surfaces have no 2d view
+        return pygame.surfarray.pixels3d(surface), pygame.Color(color)[:3]
+
+
+def scatter(surface, xs, ys, color, rect=None):
+    # Write one color at many pixels, dropping the ones that fall outside the
+    # surface (the same thing set_at does for a single pixel) or the rect.
+    x0, y0, w, h = surface.get_rect().clip(rect or surface.get_rect())
+    keep = (xs >= x0) & (xs < x0 + w) & (ys >= y0) & (ys < y0 + h)
+    xs, ys = xs[keep], ys[keep]
+    if xs.size == 0:
+        return
+    pixels, value = pixel_view(surface, color)
+    pixels[xs, ys] = value
+    del pixels
+
+
+def _ramp(lo, hi):
+    # For every line k yield the step numbers lo[k]..hi[k] together with k.
+    # This is how all the per-line loops get flattened.
+    counts = np.maximum(hi - lo + 1, 0)
+    total = int(counts.sum())
+    idx = np.repeat(np.arange(counts.size), counts)
+    starts = np.cumsum(counts) - counts
+    i = np.arange(total, dtype=np.int64) - starts[idx] + lo[idx]
+    return idx, i
+
+
+def _step_range(lines, steps, first, rect):
+    # Steps first..steps of every line, narrowed to the ones that can land
+    # inside rect. The rect is grown by a pixel so rounding never drops an
+    # edge pixel; scatter() trims whatever lands just outside.
+    lo = np.full(steps.shape, first, dtype=np.int64)
+    hi = steps.copy()
+    if rect is not None:
+        t0, t1, visible = clip_params(lines, rect, margin=1.0)
+        lo = np.maximum(lo, np.floor(t0 * steps).astype(np.int64))
+        hi = np.minimum(hi, np.ceil(t1 * steps).astype(np.int64))
+        hi[~visible] = lo[~visible] - 1
+    return _ramp(lo, hi)
+
+
+def bla_points(lines, rect=None):
+    # Pixels produced by bla() for every line, without the start point.
+    #
+    # bla() steps the major axis once per pixel and moves the minor axis
+    # whenever the decision parameter is >= 0. After i steps the minor axis
+    # has moved (2*dmin*i + dmaj) // (2*dmaj) times, so every pixel can be
+    # computed directly instead of walking pk.
+    lines = as_lines(lines)
+    x1, y1, x2, y2 = lines.T
+    dx = np.abs(x2 - x1)
+    dy = np.abs(y2 - y1)
+    lx = np.where(x2 > x1, 1, -1)
+    ly = np.where(y2 > y1, 1, -1)
+
+    xmajor = dx > dy
+    dmaj = np.where(xmajor, dx, dy)
+    dmin = np.where(xmajor, dy, dx)
+
+    idx, i = _step_range(lines, dmaj, 1, rect)
+    dmaj, dmin = dmaj[idx], dmin[idx]
+    m = (2 * dmin * i + dmaj) // (2 * dmaj)
+    xm = xmajor[idx]
+    xs = x1[idx] + lx[idx] * np.where(xm, i, m)
+    ys = y1[idx] + ly[idx] * np.where(xm, m, i)
+    return xs, ys
+
+
+def bla_lines(surface, lines, color, clip=None):
+    # Draw many lines at once, pixel for pixel the same as bla().
+    rect = clip or surface.get_clip()
+    xs, ys = bla_points(lines, rect)
+    scatter(surface, xs, ys, color, rect)
+
+
+def dda_points(lines, rect=None):
+    # Pixels of the DDA line from s.py's draw(), both endpoints included.
+    #
+    # Instead of adding float xinc/yinc and rounding every pixel, step i is
+    # computed directly as x1 + dx*i/step rounded to the nearest integer, in
+    # exact integer arithmetic: x1 + (2*dx*i + step) // (2*step). Exact .5
+    # ties round up. A line whose endpoints coincide has no steps and is just
+    # its start point.
+    lines = as_lines(lines)
+    x1, y1, x2, y2 = lines.T
+    dx = x2 - x1
+    dy = y2 - y1
+    step = np.maximum(np.abs(dx), np.abs(dy))
+
+    # degenerate lines: one pixel, no division
+    point = step == 0
+    px, py = x1[point], y1[point]
+
+    live = ~point
+    lines = lines[live]
+    x1, y1, dx, dy, step = x1[live], y1[live], dx[live], dy[live], step[live]
+
+    idx, i = _step_range(lines, step, 0, rect)
+    step = step[idx]
+    xs = x1[idx] + (2 * dx[idx] * i + step) // (2 * step)
+    ys = y1[idx] + (2 * dy[idx] * i + step) // (2 * step)
+    return np.concatenate((px, xs)), np.concatenate((py, ys))
+
+
+def dda_lines(surface, lines, color, clip=None):
+    rect = clip or surface.get_clip()
+    xs, ys = dda_points(lines, rect)
+    scatter(surface, xs, ys, color, rect)
+
+
+@lru_cache(maxsize=128)
+def circle_offsets(r):
+    # Offsets of every pixel mid_circle() plots for radius r, relative to the
+    # centre. Cached per radius so drawing a circle is just an add + scatter.
+    pts = []
+    x, y, d = 0, r, 1 - r
+    while x < y:
+        x += 1
+        pts.append((x, y))
+        if d < 0:
+            d += 2 * x + 1
+        else:
+            y -= 1
+            d += 2 * x - 2 * y + 1
+    octant = np.array(pts, dtype=np.int64).reshape(-1, 2)
+    a, b = octant.T
+    ox = np.concatenate((a, a, -a, -a, b, b, -b, -b))
+    oy = np.concatenate((b, -b, -b, b, a, -a, -a, a))
+    ox.flags.writeable = False
+    oy.flags.writeable = False
+    return ox, oy
+
+
+@lru_cache(maxsize=128)
+def circle_spans(r):
+    # Half-width of the filled circle on every row from -r to r, taken from
+    # the outline so filled and outline circles line up.
+    ox, oy = circle_offsets(r)
+    half = np.full(r + 1, -1, dtype=np.int64)
+    np.maximum.at(half, np.abs(oy), np.abs(ox))
+    # rows the outline skips (the centre row, for one) get the width of the
+    # row just outside them
+    half = np.maximum.accumulate(half[::-1])[::-1]
+    half = np.maximum(half, 0)
+    rows = np.arange(-r, r + 1)
+    half = half[np.abs(rows)]
+    rows.flags.writeable = False
+    half.flags.writeable = False
+    return rows, half
+
+
+def circle_points(centers, r):
+    centers = np.asarray(centers, dtype=np.int64).reshape(-1, 2)
+    ox, oy = circle_offsets(r)
+    xs = (centers[:, 0, None] + ox).ravel()
+    ys = (centers[:, 1, None] + oy).ravel()
+    return xs, ys
+
+
+def mid_circles(surface, centers, r, color, filled=False, clip=None):
+    # Draw a circle of radius r at every (xc, yc) in centers.
+    rect = surface.get_rect().clip(clip or surface.get_clip())
+    if not filled:
+        xs, ys = circle_points(centers, r)
+        scatter(surface, xs, ys, color, rect)
+        return
+
+    centers = np.asarray(centers, dtype=np.int64).reshape(-1, 2)
+    rows, half = circle_spans(r)
+    ys = centers[:, 1, None] + rows
+    x0 = np.maximum(centers[:, 0, None] - half, rect.left)
+    x1 = np.minimum(centers[:, 0, None] + half + 1, rect.right)
+    keep = (ys >= rect.top) & (ys < rect.bottom) & (x0 < x1)
+    pixels, value = pixel_view(surface, color)
+    for y, a, b in zip(ys[keep].tolist(), x0[keep].tolist(), x1[keep].tolist()):
+        pixels[a:b, y] = value
+    del pixels
@@ -0,0 +1,189 @@
+# Grid raycasting for the haunted house.
+#
+# cast_ray() walks a ray from tile boundary to tile boundary (Amanatides &
+# Woo's voxel traversal), so its cost is the number of tiles crossed rather
+# than the distance travelled, and it can't step past a thin corner. The map
+# is indexed grid[row][col] with non-zero tiles being walls.
+#
+# cast_rays() and render_view() do the same for every ray of a frame with
+# NumPy, writing walls, ceiling and floor straight into the pixel buffer.
+#
+# Both take an optional distance field (gfx.tilemap): from a tile whose
+# nearest wall is d tiles away a ray can cross every boundary inside that
+# (2d-1)-tile square in one go, so open areas cost a step or two per ray.
+# Sprites are drawn over the result by gfx.billboard.
+
+import math
+
+import numpy as np
+import pygame
+
+from gfx.raster import pixel_view
+
+# Which kind of tile boundary a ray hit
+SIDE_X = 0  # a wall face running north-south (the ray crossed an x boundary)
+SIDE_Y = 1  # a wall face running east-west
+
+
+class Hit:
+    __slots__ = ("distance", "side", "u", "col", "row")
+
+    def __init__(self, distance, side, u, col, row):
+        self.distance = distance  # along the ray, in world units
+        self.side = side
+        self.u = u                # 0..1 across the face that was hit
+        self.col = col
+        self.row = row
+
+
+def cast_ray(grid, tile, px, py, angle, max_depth=math.inf, field=None):
+    # The first wall the ray from (px, py) at angle hits, or None if it
+    # leaves the map or goes further than max_depth first.
+    rows, cols = len(grid), len(grid[0])
+    gx, gy = px / tile, py / tile
+    col, row = int(gx), int(gy)
+    dx, dy = math.cos(angle), math.sin(angle)
+
+    if dx > 0:
+        step_c, delta_x = 1, 1 / dx
+        next_x = (col + 1 - gx) * delta_x
+    elif dx < 0:
+        step_c, delta_x = -1, -1 / dx
+        next_x = (gx - col) * delta_x
+    else:
+        step_c, delta_x, next_x = 0, math.inf, math.inf
+
+    if dy > 0:
+        step_r, delta_y = 1, 1 / dy
+        next_y = (row + 1 - gy) * delta_y
+    elif dy < 0:
+        step_r, delta_y = -1, -1 / dy
+        next_y = (gy - row) * delta_y
+    else:
+        step_r, delta_y, next_y = 0, math.inf, math.inf
+
+    limit = max_depth / tile
+    while True:
+        k = int(field[row][col]) - 1 if field is not None else 0
+        if k > 0:
+            # Cross every boundary before the ray leaves the open square
+            leave = min(next_x + k * delta_x, next_y + k * delta_y)
+            if step_c:
+                n = min(k, max(0, math.ceil((leave - next_x) / delta_x)))
+                col += step_c * n
+                next_x += n * delta_x
+            if step_r:
+                n = min(k, max(0, math.ceil((leave - next_y) / delta_y)))
+                row += step_r * n
+                next_y += n * delta_y
+        if next_x < next_y:
+            t = next_x
+            next_x += delta_x
+            col += step_c
+            side = SIDE_X
+        else:
+            t = next_y
+            next_y += delta_y
+            row += step_r
+            side = SIDE_Y
+        if t > limit or not (0 <= col < cols and 0 <= row < rows):
+            return None
+        if grid[row][col]:
+            if side == SIDE_X:
+                u = (gy + t * dy) % 1
+            else:
+                u = (gx + t * dx) % 1
+            return Hit(t * tile, side, u, col, row)
+
+
+def cast_rays(grid, tile, px, py, angles, max_depth=np.inf, field=None):
+    # cast_ray() for a whole array of angles at once. grid is a 2D NumPy
+    # array. Returns distance (inf where nothing was hit), side and u arrays.
+    rows, cols = grid.shape
+    gx, gy = px / tile, py / tile
+    n = angles.size
+    dx, dy = np.cos(angles), np.sin(angles)
+
+    with np.errstate(divide="ignore"):
+        delta_x = np.abs(1 / dx)
+        delta_y = np.abs(1 / dy)
+    step_c = np.where(dx > 0, 1, -1)
+    step_r = np.where(dy > 0, 1, -1)
+    col = np.full(n, int(gx))
+    row = np.full(n, int(gy))
+    with np.errstate(invalid="ignore"):
+        next_x = np.where(dx > 0, (col + 1 - gx), (gx - col)) * delta_x
+        next_y = np.where(dy > 0, (row + 1 - gy), (gy - row)) * delta_y
+    next_x[dx == 0] = np.inf
+    next_y[dy == 0] = np.inf
+
+    distance = np.full(n, np.inf)
+    side = np.zeros(n, dtype=np.int8)
+    limit = max_depth / tile
+    live = np.arange(n)
+    while live.size:
+        if field is not None:
+            _skip(field, live, col, row, next_x, next_y, delta_x, delta_y, step_c, step_r)
+        nx, ny = next_x[live], next_y[live]
+        across = nx < ny
+        t = np.where(across, nx, ny)
+        next_x[live] = np.where(across, nx + delta_x[live], nx)
+        next_y[live] = np.where(across, ny, ny + delta_y[live])
+        c = col[live] = col[live] + np.where(across, step_c[live], 0)
+        r = row[live] = row[live] + np.where(across, 0, step_r[live])
+
+        inside = (t <= limit) & (c >= 0) & (c < cols) & (r >= 0) & (r < rows)
+        wall = np.zeros(live.size, dtype=bool)
+        wall[inside] = grid[r[inside], c[inside]] != 0
+        done = live[wall]
+        distance[done] = t[wall]
+        side[done] = np.where(across[wall], SIDE_X, SIDE_Y)
+        live = live[inside & ~wall]
+
+    with np.errstate(invalid="ignore"):
+        u = np.where(side == SIDE_X, gy + distance * dy, gx + distance * dx) % 1
+    return distance * tile, side, u
+
+
+def _skip(field, live, col, row, next_x, next_y, delta_x, delta_y, step_c, step_r):
+    # The vectorised form of the open-square jump in cast_ray()
+    k = field[row[live], col[live]].astype(np.int64) - 1
+    jump = k > 0
+    if not jump.any():
+        return
+    i, k = live[jump], k[jump]
+    with np.errstate(invalid="ignore"):
+        leave = np.minimum(next_x[i] + k * delta_x[i], next_y[i] + k * delta_y[i])
+        nx = np.clip(np.ceil((leave - next_x[i]) / delta_x[i]), 0, k)
+        ny = np.clip(np.ceil((leave - next_y[i]) / delta_y[i]), 0, k)
+    nx = np.nan_to_num(nx).astype(np.int64)
+    ny = np.nan_to_num(ny).astype(np.int64)
+    x, y = nx > 0, ny > 0
+    col[i] += step_c[i] * nx
+    row[i] += step_r[i] * ny
+    next_x[i[x]] += nx[x] * delta_x[i[x]]
+    next_y[i[y]] += ny[y] * delta_y[i[y]]
+
+
+def render_view(surface, depth, dist_proj, tile, wall, ceiling, floor):
+    # Draw every wall column plus the ceiling and floor straight into the
+    # surface's pixels in one pass. depth holds the corrected distance of
+    # each ray (inf for no wall); rays are spread evenly across the width.
+    # Returns the depth of every screen column, for depth-testing sprites.
+    w, h = surface.get_size()
+    depth = depth[np.arange(w) * depth.size // w]
+    with np.errstate(divide="ignore"):
+        height = np.minimum(dist_proj * tile / (depth + 0.01), h).astype(np.int64)
+    top = (h / 2 - height / 2).astype(np.int64)
+
+    ys = np.arange(h)[None, :]
+    is_wall = (ys >= top[:, None]) & (ys < (top + height)[:, None])
+    pixels, _ = pixel_view(surface, wall)
+    if pixels.ndim == 2:
+        colors = np.array([surface.map_rgb(c) for c in (ceiling, floor, wall)], dtype=pixels.dtype)
+    else:
+        colors = np.array([pygame.Color(c)[:3] for c in (ceiling, floor, wall)], dtype=pixels.dtype)
+    pick = np.where(is_wall, 2, np.where(ys < h // 2, 0, 1))
+    pixels[...] = colors[pick]
+    del pixels
+    return depth
@@ -0,0 +1,175 @@
+# Compact binary input logs for deterministic replays.
+#
+# Every frame's input is packed into one bit per channel (a control such as
+# "RED.up"), so a frame of up to 64 controls costs at most 8 bytes. The log
+# also keeps the RNG seed the session ran with and, optionally, state
+# snapshots every few frames so a replay can jump to any frame without
+# re-simulating from the start. meta holds any other settings the session
+# needs to be reproduced (a dict).
+#
+# meta and snapshots are stored as JSON, so loading a log never runs code
+# from it. That limits them to numbers, strings, bools, None, lists and
+# dicts with string keys; tuples come back as lists.
+#
+# File layout (little endian):
+#   b"INPL", version u16, channel count u16, word size u16, seed u64,
+#   frame count u32, snapshot count u32, meta length u32,
+#   channel names (u16 length + utf-8 each), meta,
+#   frame words (frame count * word size bytes),
+#   snapshots (frame u32, length u32, utf-8 JSON each)
+
+import json
+import struct
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+MAGIC = b"INPL"
+VERSION = 2
+_HEADER = struct.Struct("<4sHHHQIII")
+_WORDS = {1: ("B", np.uint8), 2: ("H", np.uint16), 4: ("I", np.uint32), 8: ("Q", np.uint64)}
+
+
+def _word_size(channels):
+    for size in sorted(_WORDS):
+        if channels <= size * 8:
+            return size
+    raise ValueError("an input log holds at most 64 channels")
+
+
+def _encode(value):
+    # Fails here, while recording, rather than on load
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class InputRecorder:
+    def __init__(self, channels, seed=0, snapshot_every=0, meta=None):
+        self.channels = list(channels)
+        self.seed = seed
+        self.meta = meta or {}
+        self.snapshot_every = snapshot_every
+        self.word = _word_size(len(self.channels))
+        self.frames = array(_WORDS[self.word][0])
+        self.snapshots = []
+
+    def __len__(self):
+        return len(self.frames)
+
+    def wants_snapshot(self):
+        # True when the frame about to be recorded should get a snapshot
+        n = len(self.frames)
+        return bool(self.snapshot_every) and n % self.snapshot_every == 0
+
+    def snapshot(self, state):
+        # state describes the simulation before the next recorded frame runs
+        self.snapshots.append((len(self.frames), _encode(state)))
+
+    def record(self, pressed):
+        # pressed: one bool per channel, in channel order
+        bits = 0
+        for i, on in enumerate(pressed):
+            if on:
+                bits |= 1 << i
+        self.frames.append(bits)
+
+    def save(self, path):
+        meta = _encode(self.meta)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(self.channels), self.word, self.seed,
+                                 len(self.frames), len(self.snapshots), len(meta)))
+            for name in self.channels:
+                raw = name.encode("utf-8")
+                f.write(struct.pack("<H", len(raw)) + raw)
+            f.write(meta)
+            f.write(self.frames.tobytes())
+            for frame, raw in self.snapshots:
+                f.write(struct.pack("<II", frame, len(raw)) + raw)
+
+
+class InputLog:
+    def __init__(self, channels, seed, frames, snapshots, meta=None):
+        self.channels = channels
+        self.seed = seed
+        self.meta = meta or {}
+        self.frames = frames
+        self.snapshot_frames = [f for f, _ in snapshots]
+        self._snapshots = [raw for _, raw in snapshots]
+        self._bits = np.arange(len(channels), dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, nch, word, seed, nframes, nsnap, nmeta = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input log")
+        at = _HEADER.size
+        channels = []
+        for _ in range(nch):
+            (n,) = struct.unpack_from("<H", data, at)
+            channels.append(data[at + 2:at + 2 + n].decode("utf-8"))
+            at += 2 + n
+        meta = json.loads(data[at:at + nmeta])
+        at += nmeta
+        frames = np.frombuffer(data, dtype=_WORDS[word][1], count=nframes, offset=at)
+        at += nframes * word
+        snapshots = []
+        for _ in range(nsnap):
+            frame, n = struct.unpack_from("<II", data, at)
+            snapshots.append((frame, data[at + 8:at + 8 + n]))
+            at += 8 + n
+        return cls(channels, seed, frames, snapshots, meta)
+
+    def pressed(self, frame):
+        # {channel: bool} for one frame
+        bits = int(self.frames[frame])
+        return {name: bool(bits >> i & 1) for i, name in enumerate(self.channels)}
+
+    def unpacked(self):
+        # (frames, channels) bool array of the whole log
+        return (self.frames.astype(np.uint64)[:, None] >> self._bits) & 1 == 1
+
+    def snapshot_before(self, frame):
+        # (frame, state) of the latest snapshot at or before frame, or None
+        i = bisect_right(self.snapshot_frames, frame) - 1
+        if i < 0:
+            return None
+        return self.snapshot_frames[i], json.loads(self._snapshots[i])
+
+
+class Replay:
+    # Runs a log back through a simulation. step(frame, pressed) advances the
+    # simulation by one frame; restore(state) loads a snapshot.
+    def __init__(self, log, step, restore=None):
+        self.log = log
+        self.step = step
+        self.restore = restore
+        self.frame = 0
+
+    def done(self):
+        return self.frame >= len(self.log)
+
+    def advance(self):
+        self.step(self.frame, self.log.pressed(self.frame))
+        self.frame += 1
+
+    def seek(self, frame):
+        # Jump to frame: restore the nearest snapshot before it (if that is
+        # ahead of where we are) and simulate the rest of the way
+        frame = min(frame, len(self.log))
+        snap = self.log.snapshot_before(frame) if self.restore else None
+        if snap and (snap[0] > self.frame or frame < self.frame):
+            self.frame, state = snap
+            self.restore(state)
+        elif frame < self.frame:
+            raise ValueError("can't seek backwards without a snapshot")
+        while self.frame < frame:
+            self.advance()
+
+    def run(self):
+        while not self.done():
+            self.advance()
@@ -0,0 +1,43 @@
+# Pre-rotated copies of a sprite.
+#
+# Angles are snapped to a fixed step and each rotation is rendered once, the
+# first time it is needed (or all up front with prerender()), so drawing a
+# rotated sprite is a dict lookup and a blit instead of a resample per frame.
+
+import pygame
+
+
+class RotationCache:
+    def __init__(self, surface, step=3.0, smooth=False):
+        # smooth=True renders with rotozoom, which filters the edges but is
+        # slower to build; it makes no difference once a frame is cached.
+        self.surface = surface
+        self.step = step
+        self.smooth = smooth
+        self.count = max(1, round(360 / step))
+        self.frames = {}
+
+    def index(self, angle):
+        return round(angle / self.step) % self.count
+
+    def _render(self, i):
+        angle = i * self.step
+        if self.smooth:
+            return pygame.transform.rotozoom(self.surface, angle, 1)
+        return pygame.transform.rotate(self.surface, angle)
+
+    def get(self, angle):
+        i = self.index(angle)
+        frame = self.frames.get(i)
+        if frame is None:
+            frame = self.frames[i] = self._render(i)
+        return frame
+
+    def prerender(self):
+        for i in range(self.count):
+            self.get(i * self.step)
+        return self
+
+    def blit(self, screen, angle, center):
+        frame = self.get(angle)
+        return screen.blit(frame, frame.get_rect(center=center))
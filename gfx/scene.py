@@ -0,0 +1,95 @@
+# Retained-mode drawing for the demo scripts.
+#
+# Static drawings are added to a Scene once and rasterized into a cached
+# surface. run() only redraws that surface when something invalidates it and
+# otherwise sleeps in pygame.event.wait(), so an idle window costs no CPU.
+# While the scene is animating the loop runs at a capped frame rate instead,
+# as it does while the frame-time overlay (F3) is showing.
+
+import pygame
+
+from gfx.profiler import FrameProfiler
+
+# Posted by Scene.invalidate() so a loop blocked in event.wait() wakes up
+REDRAW = pygame.event.custom_type()
+
+
+class Scene:
+    def __init__(self, size, background=(0, 0, 0)):
+        self.size = size
+        self.background = background
+        self.layers = []
+        self.surface = None
+        self.dirty = True
+        self.animating = False
+
+    def add(self, draw):
+        # draw(surface) is called whenever the scene has to be re-rasterized
+        self.layers.append(draw)
+        self.invalidate()
+        return draw
+
+    def invalidate(self):
+        if not self.dirty and pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(REDRAW))
+        self.dirty = True
+
+    def animate(self, on=True):
+        self.animating = on
+        if on:
+            self.invalidate()
+
+    def render(self):
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size)
+        if self.dirty:
+            self.surface.fill(self.background)
+            for draw in self.layers:
+                draw(self.surface)
+            self.dirty = False
+        return self.surface
+
+
+def run(screen, scene, fps=60, update=None, handle=None, profiler=None):
+    # update(dt) is called every frame while the scene is animating and should
+    # invalidate it when the picture changes. handle(event) sees every event.
+    # profiler is the gfx.profiler.FrameProfiler timing the loop; by default
+    # one that stays off until F3 is pressed.
+    if profiler is None:
+        profiler = FrameProfiler()
+    clock = pygame.time.Clock()
+    shown = False
+    while True:
+        overlay = profiler.show
+        profiler.frame()
+        if scene.dirty or not shown or overlay:
+            with profiler.phase("draw"):
+                screen.blit(scene.render(), (0, 0))
+            if overlay:
+                profiler.draw(screen)
+            with profiler.phase("flip"):
+                pygame.display.flip()
+            shown = True
+
+        if scene.animating or overlay:
+            events = pygame.event.get()
+            dt = clock.tick(fps) / 1000
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+            clock.tick()
+            dt = 0
+
+        with profiler.phase("event"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    return
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    shown = False
+                if profiler.handle(event) and not profiler.show:
+                    shown = False  # take the overlay off the screen
+                if handle:
+                    handle(event)
+
+        if update and scene.animating:
+            with profiler.phase("update"):
+                update(dt)
@@ -0,0 +1,70 @@
+# Uniform-grid spatial hash for broadphase collision.
+#
+# Objects are stored by the grid cells their bounding box overlaps. Moving an
+# object only touches the hash when it crosses into different cells, and a
+# query returns the objects in the cells around a box, so the cost of a test
+# depends on how crowded the neighbourhood is, not on the total count.
+
+
+class SpatialHash:
+    def __init__(self, cell=64):
+        self.cell = cell
+        self.cells = {}
+        self.where = {}
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, obj):
+        return obj in self.where
+
+    def _span(self, x, y, hx, hy):
+        c = self.cell
+        return (int((x - hx) // c), int((y - hy) // c),
+                int((x + hx) // c), int((y + hy) // c))
+
+    def _keys(self, span):
+        x0, y0, x1, y1 = span
+        return [(i, j) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1)]
+
+    def insert(self, obj, x, y, hx, hy=None):
+        # hx, hy are the half width and half height of obj's bounding box
+        span = self._span(x, y, hx, hx if hy is None else hy)
+        self.where[obj] = span
+        for key in self._keys(span):
+            self.cells.setdefault(key, []).append(obj)
+
+    def remove(self, obj):
+        span = self.where.pop(obj)
+        for key in self._keys(span):
+            bucket = self.cells[key]
+            bucket.remove(obj)
+            if not bucket:
+                del self.cells[key]
+
+    def move(self, obj, x, y, hx, hy=None):
+        span = self._span(x, y, hx, hx if hy is None else hy)
+        if self.where.get(obj) == span:
+            return
+        if obj in self.where:
+            self.remove(obj)
+        self.insert(obj, x, y, hx, hy)
+
+    def query(self, x, y, hx, hy=None):
+        # Everything whose cells overlap the box; callers do the exact test
+        found = []
+        seen = set()
+        cells = self.cells
+        for key in self._keys(self._span(x, y, hx, hx if hy is None else hy)):
+            for obj in cells.get(key, ()):
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    found.append(obj)
+        return found
+
+    def at(self, x, y):
+        # Everything whose cells include the point: one lookup, for objects
+        # stored with boxes already grown by whatever is testing against
+        # them. The list is the hash's own, so don't change it.
+        c = self.cell
+        return self.cells.get((int(x // c), int(y // c)), ())
@@ -0,0 +1,115 @@
+# Tile maps in a compact binary file, with a distance-to-wall field.
+#
+# File layout (little-endian):
+#   header  "<4sHHII"  magic b"TMAP", version, flags, cols, rows
+#   tiles   rows * cols uint8, row by row, non-zero = wall
+#   field   rows * cols uint8, only when flags has HAS_FIELD
+# Both grids are read with np.memmap by default, so a 4096x4096 map opens
+# without reading it and only the pages actually touched are loaded.
+#
+# field[row, col] is the Chebyshev distance in tiles from that tile to the
+# nearest wall (0 on walls, capped at 255, and the area outside the map
+# counts as wall). Every tile less than that distance away is empty, which
+# lets a ray jump straight across open space (see gfx.raycast).
+
+import struct
+
+import numpy as np
+
+MAGIC = b"TMAP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+HAS_FIELD = 1
+FIELD_CAP = 255
+
+
+def _along(d):
+    # Distance along the row, left to right: running minimum of (d - i),
+    # plus i back. The wall outside the map sits at i = -1.
+    i = np.arange(-1, d.size)
+    return (np.minimum.accumulate(np.concatenate(([0], d)) - i) + i)[1:]
+
+
+def _from_row(d, prev):
+    # Fold in the three neighbours in the previous row (prev is padded with
+    # a wall at each end)
+    return np.minimum(d, np.minimum(np.minimum(prev[:-2], prev[1:-1]), prev[2:]) + 1)
+
+
+def distance_field(tiles, cap=FIELD_CAP):
+    # Two-pass chamfer transform with unit weights over all 8 neighbours,
+    # which is exact for the Chebyshev distance: top-down with left-to-right
+    # rows, then bottom-up with right-to-left rows.
+    rows, cols = tiles.shape
+    dist = np.empty((rows, cols), dtype=np.int32)
+    prev = np.zeros(cols + 2, dtype=np.int32)
+    for r in range(rows):
+        d = np.where(tiles[r] != 0, 0, cap).astype(np.int32)
+        dist[r] = d = np.minimum(_along(_from_row(d, prev)), cap)
+        prev = np.pad(d, 1)
+
+    field = np.empty((rows, cols), dtype=np.uint8)
+    prev = np.zeros(cols + 2, dtype=np.int32)
+    for r in range(rows - 1, -1, -1):
+        d = _along(_from_row(dist[r], prev)[::-1])[::-1]
+        field[r] = d = np.minimum(d, cap)
+        prev = np.pad(d, 1)
+    return field
+
+
+class TileMap:
+    def __init__(self, tiles, field=None):
+        # tiles is a 2D uint8 array indexed [row, col]
+        self.tiles = tiles
+        self.rows, self.cols = tiles.shape
+        self.field = distance_field(tiles) if field is None else field
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(np.array(rows, dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path, "rb") as f:
+            magic, version, flags, cols, rows = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tile map")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported map version {version}")
+            if not mmap:
+                tiles = np.fromfile(f, dtype=np.uint8, count=rows * cols).reshape(rows, cols)
+                field = None
+                if flags & HAS_FIELD:
+                    field = np.fromfile(f, dtype=np.uint8, count=rows * cols).reshape(rows, cols)
+                return cls(tiles, field)
+        tiles = np.memmap(path, np.uint8, "r", HEADER.size, (rows, cols))
+        field = None
+        if flags & HAS_FIELD:
+            field = np.memmap(path, np.uint8, "r", HEADER.size + rows * cols, (rows, cols))
+        return cls(tiles, field)
+
+    def save(self, path, with_field=True):
+        # Storing the field makes loading instant; without it the field is
+        # worked out again on every load.
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, HAS_FIELD if with_field else 0, self.cols, self.rows))
+            f.write(np.ascontiguousarray(self.tiles, dtype=np.uint8).tobytes())
+            if with_field:
+                f.write(np.ascontiguousarray(self.field, dtype=np.uint8).tobytes())
+
+    def solid(self, col, row):
+        # Anything outside the map is solid
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return bool(self.tiles[row, col])
+        return True
+
+    def solid_at(self, x, y, tile):
+        # Same for a point in world units
+        return self.solid(int(x // tile), int(y // tile))
+
+    def clearance(self, x, y, tile):
+        # How many tiles of open space surround the point in every direction
+        col, row = int(x // tile), int(y // tile)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return int(self.field[row, col])
+        return 0
@@ -0,0 +1,26 @@
+# Fixed-timestep accumulator.
+#
+# Real frame times are added up and paid out in whole ticks of `tick`
+# seconds, so the simulation advances the same way whatever the frame rate.
+# alpha is how far the renderer is between the last two ticks and can be used
+# to interpolate what is drawn.
+
+
+class FixedTimestep:
+    def __init__(self, tick, max_frame=0.25):
+        self.tick = tick
+        # Long stalls (window drags, breakpoints) are capped so the
+        # simulation doesn't try to catch up with thousands of ticks at once
+        self.max_frame = max_frame
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        # Returns how many ticks to run for this frame
+        self.accumulator += min(frame_dt, self.max_frame)
+        steps = int(self.accumulator // self.tick)
+        self.accumulator -= steps * self.tick
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.tick
@@ -0,0 +1,88 @@
+# 2D transforms as 3x3 homogeneous matrices.
+#
+# Every builder returns a matrix that acts on column vectors (x, y, 1), so
+# compose(a, b) means "apply a, then b". apply() transforms a whole (N,2)
+# vertex array with one matrix product.
+
+import math
+
+import numpy as np
+
+from gfx.raster import bla_lines
+
+
+def identity():
+    return np.eye(3)
+
+
+def translate(tx, ty):
+    m = np.eye(3)
+    m[0, 2] = tx
+    m[1, 2] = ty
+    return m
+
+
+def _about(m, pivot):
+    # Conjugate m so it acts around pivot instead of the origin
+    if pivot is None:
+        return m
+    px, py = pivot
+    return translate(px, py) @ m @ translate(-px, -py)
+
+
+def rotate(degrees, pivot=None):
+    # Positive angles turn x towards y, which is clockwise on screen
+    a = math.radians(degrees)
+    c, s = math.cos(a), math.sin(a)
+    m = np.array([[c, -s, 0.0],
+                  [s, c, 0.0],
+                  [0.0, 0.0, 1.0]])
+    return _about(m, pivot)
+
+
+def scale(sx, sy=None, pivot=None):
+    if sy is None:
+        sy = sx
+    return _about(np.diag([sx, sy, 1.0]), pivot)
+
+
+def shear(kx=0.0, ky=0.0, pivot=None):
+    m = np.array([[1.0, kx, 0.0],
+                  [ky, 1.0, 0.0],
+                  [0.0, 0.0, 1.0]])
+    return _about(m, pivot)
+
+
+def reflect(axis="x", pivot=None):
+    # axis "x" mirrors across the horizontal line through pivot, "y" across
+    # the vertical one and "xy" through the pivot point itself.
+    sx = -1.0 if "y" in axis else 1.0
+    sy = -1.0 if "x" in axis else 1.0
+    return _about(np.diag([sx, sy, 1.0]), pivot)
+
+
+def compose(*matrices):
+    m = np.eye(3)
+    for step in matrices:
+        m = step @ m
+    return m
+
+
+def apply(m, points):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return points @ m[:2, :2].T + m[:2, 2]
+
+
+def draw_edges(surface, m, vertices, edges, color, width=1):
+    # Transform the vertices once and draw every (i, j) edge between them
+    # in a single batch. Wider edges are thickened the way pygame.draw.line
+    # does it: the line is repeated one pixel further across its minor axis
+    # for every extra pixel of width.
+    v = np.rint(apply(m, vertices)).astype(np.int64)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    lines = np.hstack((v[edges[:, 0]], v[edges[:, 1]]))
+    if width > 1:
+        xmajor = np.abs(lines[:, 2] - lines[:, 0]) > np.abs(lines[:, 3] - lines[:, 1])
+        shift = np.where(xmajor[:, None], [0, 1, 0, 1], [1, 0, 1, 0])
+        lines = np.concatenate([lines + off * shift for off in range(-((width - 1) // 2), width // 2 + 1)])
+    bla_lines(surface, lines, color)
@@ -0,0 +1,99 @@
+# Frame-driven tweens.
+#
+# A Tween moves one value (an attribute, or a key of a dict) from start to end
+# over a duration in seconds. A Timeline holds any number of them and is
+# advanced once per frame with the frame's real dt, so animations run at the
+# same speed whatever the frame rate and never block the event loop.
+
+import math
+
+
+def linear(t):
+    return t
+
+
+def ease_in_quad(t):
+    return t * t
+
+
+def ease_out_quad(t):
+    return t * (2 - t)
+
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t)
+
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_sine(t):
+    return 0.5 - 0.5 * math.cos(math.pi * t)
+
+
+class Tween:
+    def __init__(self, target, key, start, end, duration, ease=linear,
+                 delay=0.0, loop=False, on_done=None):
+        self.target = target
+        self.key = key
+        self.start = start
+        self.end = end
+        self.duration = max(duration, 1e-9)
+        self.ease = ease
+        self.loop = loop
+        self.on_done = on_done
+        self.time = -delay
+        self.done = False
+        self._set(start)
+
+    def _set(self, value):
+        if isinstance(self.target, dict):
+            self.target[self.key] = value
+        else:
+            setattr(self.target, self.key, value)
+
+    def update(self, dt):
+        # Returns False once the tween has finished
+        self.time += dt
+        if self.time < 0:
+            return True
+        if self.time >= self.duration:
+            if self.loop:
+                self.time %= self.duration
+            else:
+                self._set(self.end)
+                self.done = True
+                if self.on_done:
+                    self.on_done()
+                return False
+        k = self.ease(self.time / self.duration)
+        self._set(self.start + (self.end - self.start) * k)
+        return True
+
+
+class Timeline:
+    def __init__(self):
+        self.tracks = []
+
+    def add(self, *args, **kwargs):
+        tween = Tween(*args, **kwargs)
+        self.tracks.append(tween)
+        return tween
+
+    def cancel(self, tween):
+        tween.done = True
+        if tween in self.tracks:
+            self.tracks.remove(tween)
+
+    def update(self, dt):
+        # on_done callbacks may add or cancel tracks, so this walks a copy:
+        # tracks added during the frame start on the next one, and ones
+        # cancelled before their turn are skipped
+        for t in list(self.tracks):
+            if not t.done:
+                t.update(dt)
+        self.tracks = [t for t in self.tracks if not t.done]
+
+    def __len__(self):
+        return len(self.tracks)
@@ -1,5 +1,13 @@
 import pygame
-import math
+import sys
+import time
+from gfx.car import TICK, CarInput, CarParams, CarState, simulate, step
+from gfx.rotcache import RotationCache
+from gfx.fonts import get_font, render_text
+from gfx.timestep import FixedTimestep
+from gfx.replay import InputLog, InputRecorder, Replay
+from gfx.cli import arg
+from gfx.profiler import FrameProfiler
 
 # --- Configuration & Colors ---
 WIDTH, HEIGHT = 1000, 700
@@ -24,55 +32,69 @@ class McLarenCar:
 
         self.surface = self.original_surface
         self.rect = self.surface.get_rect(center=(x, y))
+        # Rotated copies of the car, one per 3 degrees, built as they are needed
+        self.rotations = RotationCache(self.original_surface, step=3)
         
         # Physics Variables (Adjusted for the new size)
-        self.angle = 0
-        self.speed = 0
-        self.acceleration = 0.15
-        self.friction = 0.04
-        self.max_speed = 10
-        self.steering = 3.5
-        self.x, self.y = float(x), float(y)
-
-    def drive(self):
-        keys = pygame.key.get_pressed()
-
-        # Acceleration / Braking
-        if keys[pygame.K_UP]:
-            self.speed += self.acceleration
-        elif keys[pygame.K_DOWN]:
-            self.speed -= self.acceleration
-        else:
-            # Apply friction when no key is pressed
-            if self.speed > 0: self.speed -= self.friction
-            elif self.speed < 0: self.speed += self.friction
-
-        # Limit speed
-        self.speed = max(-self.max_speed / 2, min(self.speed, self.max_speed))
-
-        # Steering (Only steer if the car is moving)
-        if abs(self.speed) > 0.1:
-            direction = 1 if self.speed > 0 else -1
-            if keys[pygame.K_LEFT]:
-                self.angle += self.steering * direction
-            if keys[pygame.K_RIGHT]:
-                self.angle -= self.steering * direction
-
-    def move(self):
-        # Convert angle to radians for trigonometry
-        radians = math.radians(self.angle)
-        # Computer Graphics Math: Calculating new X and Y based on angle
-        # We use -90 degrees offset because the car surface is drawn vertically
-        self.x += self.speed * math.sin(radians)
-        self.y -= self.speed * math.cos(radians)
-        
-        self.rect.center = (self.x, self.y)
+        # The physics itself lives in gfx/car.py; the car keeps the last two
+        # ticks so drawing can interpolate between them.
+        self.params = CarParams(acceleration=0.15, friction=0.04, max_speed=10, steering=3.5)
+        self.state = CarState(float(x), float(y))
+        self.prev_state = self.state
+
+    @property
+    def speed(self):
+        return self.state.speed
+
+    def update(self, controls, dt=TICK):
+        self.prev_state = self.state
+        self.state = step(self.state, controls, self.params, dt)
+
+    def draw(self, screen, alpha=1.0):
+        # alpha is how far we are between the previous tick and the current one
+        shown = self.prev_state.lerp(self.state, alpha)
+        self.rect.center = (shown.x, shown.y)
+        # Look up the car rotated to its current angle
+        self.rotations.blit(screen, shown.angle, self.rect.center)
+
+def read_controls():
+    keys = pygame.key.get_pressed()
+    return CarInput(keys[pygame.K_UP], keys[pygame.K_DOWN], keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+
+# --- Command line ---
+#   --record FILE        save this session's inputs to FILE
+#   --replay FILE        drive the car from a recorded FILE instead of the keys
+#   --seek TICK          start a replay at TICK
+#   --headless [SECONDS] run without a window: replay FILE at full speed, or
+#                        simulate a full-throttle left-hand loop for SECONDS
+#   --profile FILE       write per-frame phase timings to FILE (CSV)
+#   --frames N           quit after N frames
+# F3 shows the frame-time overlay.
+RECORD = arg("--record")
+REPLAY = arg("--replay")
+SEEK = int(arg("--seek", 0))
+PROFILE = arg("--profile")
+FRAMES = int(arg("--frames", 0))
+# Car state is snapshotted this often (in ticks) so replays can seek
+SNAPSHOT_EVERY = 600
+
+# --- Headless run ---
+# Reports how much faster than real time the physics ran.
+if "--headless" in sys.argv:
+    start = time.perf_counter()
+    if REPLAY:
+        log = InputLog.load(REPLAY)
+        inputs = [CarInput(*row) for row in log.unpacked().tolist()]
+        ticks = len(inputs)
+    else:
+        ticks = int(float(arg("--headless", 600)) / TICK)
+        inputs = lambda t, s: CarInput(True, False, True, False)
+    final = simulate(CarState(WIDTH // 2, HEIGHT // 2), inputs, ticks=ticks)
+    took = time.perf_counter() - start
+    print(f"{ticks} ticks in {took:.3f}s ({ticks * TICK / took:.0f}x real time)")
+    print(f"x={final.x:.2f} y={final.y:.2f} angle={final.angle:.2f} speed={final.speed:.2f}")
+    sys.exit()
 
-    def draw(self, screen):
-        # Rotate the car based on its current angle
-        rotated_car = pygame.transform.rotate(self.original_surface, self.angle)
-        new_rect = rotated_car.get_rect(center=self.rect.center)
-        screen.blit(rotated_car, new_rect.topleft)
 
 # --- Main Game Setup ---
 pygame.init()
@@ -81,31 +103,70 @@ pygame.display.set_caption("McLaren F1 Simulation - Computer Graphics Project")
 clock = pygame.time.Clock()
 
 mclaren = McLarenCar(WIDTH // 2, HEIGHT // 2)
+# Physics runs in fixed 1/60 s ticks however long each frame actually takes
+timestep = FixedTimestep(TICK)
+
+# Inputs are recorded and replayed per physics tick, which is what makes
+# replays come out the same as the session they were recorded from
+recorder = InputRecorder(CarInput._fields, snapshot_every=SNAPSHOT_EVERY) if RECORD else None
+replay = None
+if REPLAY:
+    def restore(saved):
+        mclaren.state, mclaren.prev_state = (CarState(*s) for s in saved)
+    replay = Replay(InputLog.load(REPLAY), lambda tick, pressed: mclaren.update(CarInput(**pressed)), restore)
+    replay.seek(SEEK)
+
+profiler = FrameProfiler(csv_path=PROFILE)
 
 running = True
+frame = 0
 while running:
-    screen.fill(ASPHALT_GREY) # Road Background
+    profiler.frame()
+    frame += 1
+    if frame == FRAMES:
+        running = False
 
     # 1. Event Handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    with profiler.phase("event"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            profiler.handle(event)
 
     # 2. Logic / Physics
-    mclaren.drive()
-    mclaren.move()
+    with profiler.phase("update"):
+        controls = read_controls()
+        for _ in range(timestep.advance(clock.get_time() / 1000)):
+            if replay:
+                if replay.done():
+                    running = False
+                    break
+                replay.advance()
+                continue
+            if recorder is not None:
+                if recorder.wants_snapshot():
+                    recorder.snapshot([(s.x, s.y, s.angle, s.speed) for s in (mclaren.state, mclaren.prev_state)])
+                recorder.record(controls)
+            mclaren.update(controls)
 
     # 3. Drawing
-    # Draw simple track lines
-    pygame.draw.rect(screen, WHITE, (50, 50, WIDTH-100, HEIGHT-100), 5) 
-    mclaren.draw(screen)
-
-    # UI Info
-    font = pygame.font.SysFont("Arial", 20)
-    speed_text = font.render(f"Speed: {abs(int(mclaren.speed * 20))} km/h", True, WHITE)
-    screen.blit(speed_text, (20, 20))
-
-    pygame.display.flip()
+    with profiler.phase("draw"):
+        screen.fill(ASPHALT_GREY) # Road Background
+        # Draw simple track lines
+        pygame.draw.rect(screen, WHITE, (50, 50, WIDTH-100, HEIGHT-100), 5) 
+        mclaren.draw(screen, timestep.alpha)
+
+        # UI Info
+        font = get_font("Arial", 20)
+        speed_text = render_text(f"Speed: {abs(int(mclaren.speed * 20))} km/h", font, WHITE)
+        screen.blit(speed_text, (20, 20))
+    profiler.draw(screen, (WIDTH - 260, 20))
+
+    with profiler.phase("flip"):
+        pygame.display.flip()
     clock.tick(60) # 60 FPS
 
+if recorder is not None:
+    recorder.save(RECORD)
+profiler.close()
 pygame.quit()
\ No newline at end of file
@@ -1,6 +1,22 @@
 import pygame
 import random
 import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gfx.rotcache import RotationCache
+from gfx.fonts import get_font, render_text
+from gfx.particles import ParticlePool
+from gfx.spatial import SpatialHash
+from gfx.placement import water_index, place
+from gfx.dirty import DirtyRects
+from gfx.racing_line import RacingLine, LineFollower
+from gfx.replay import InputLog, InputRecorder, Replay
+from gfx.cli import arg
+from gfx.profiler import FrameProfiler
+import numpy as np
+import time
 
 # --- Configuration ---
 WIDTH, HEIGHT = 1200, 650
@@ -13,7 +29,50 @@ BUOY_RED = (220, 40, 40)
 ROCK_GRAY = (110, 110, 110)
 LOG_BROWN = (140, 90, 40)
 WATER_COLOR = (135, 206, 235)  # Sky Blue
-
+# CPU boats take these in turn, so however many there are they share a few
+# hull sprites (see hull_rotations)
+CPU_COLORS = [(230, 160, 40), (60, 180, 75), (240, 220, 60), (160, 80, 200),
+              (70, 210, 210), (240, 120, 180), (250, 250, 250), (40, 40, 40)]
+
+# Wake particles: pool size per boat, and emit one every N frames
+WAKE_CAPACITY = 128
+WAKE_EMIT_EVERY = 1
+
+# Collision grid cell size, and the radius boats keep from each other
+GRID_CELL = 64
+BOAT_RADIUS = 10
+
+# --- Command line ---
+#   --seed N         obstacle layout seed
+#   --ai N           number of CPU boats (default 0)
+#   --record FILE    save the players' inputs (and the seed) to FILE
+#   --replay FILE    play FILE back instead of reading the keyboard
+#   --seek FRAME     start a replay at FRAME
+#   --headless       no window, no frame cap: replay FILE (or race until
+#                    --frames N) as fast as possible and print the result
+#   --frames N       quit after N frames (with a window too)
+#   --profile FILE   write per-frame phase timings to FILE (CSV)
+# F3 shows the frame-time overlay.
+RECORD = arg("--record")
+REPLAY = InputLog.load(arg("--replay")) if arg("--replay") else None
+SEEK = int(arg("--seek", 0))
+HEADLESS = "--headless" in sys.argv
+FRAMES = int(arg("--frames", 0))
+PROFILE = arg("--profile")
+# Game state is snapshotted this often (in frames) so replays can seek
+SNAPSHOT_EVERY = 600
+
+# Obstacle layout: how many, how far apart, and the seed that reproduces it.
+# A replay reuses the seed it was recorded with.
+OBSTACLE_COUNT = 12
+OBSTACLE_SPACING = 40
+SEED = REPLAY.seed if REPLAY is not None else int(arg("--seed", random.randrange(2**31)))
+
+# CPU boats racing alongside the players (a replay uses the recorded count)
+AI_BOATS = REPLAY.meta.get("ai", 0) if REPLAY is not None else int(arg("--ai", 0))
+
+if HEADLESS:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
 pygame.init()
 
 # --- Track waypoints ---
@@ -23,56 +82,66 @@ TRACK_POINTS = [
 ]
 FINISH_LINE = ((80, 325), (220, 325))
 
-# ---------------------------------------------------------
-# Wake particles
-# ---------------------------------------------------------
-class WakeParticle:
-    def __init__(self, x, y):
-        self.pos = pygame.Vector2(x, y)
-        self.alpha = 255
-        self.size = random.randint(5, 10)
-
-    def update(self):
-        self.alpha -= 4
-        return self.alpha > 0
-
-    def draw(self, screen):
-        surf = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-        pygame.draw.circle(surf, (255, 255, 255, self.alpha),
-                           (self.size//2, self.size//2), self.size//2)
-        screen.blit(surf, (self.pos.x - self.size//2, self.pos.y - self.size//2))
-
 # ---------------------------------------------------------
 # Obstacles
 # ---------------------------------------------------------
 class Obstacle:
-    def __init__(self, x, y, type):
+    def __init__(self, x, y, type, rng=random):
         self.pos = pygame.Vector2(x, y)
         self.type = type
         self.offset = 0
-        if type == "rock": self.size = random.randint(25, 40)
-        elif type == "log": self.size = random.randint(50, 80)
+        if type == "rock": self.size = rng.randint(25, 40)
+        elif type == "log": self.size = rng.randint(50, 80)
         else: self.size = 25
 
+    # Half width / height of the box a boat's centre has to be in to hit
+    # the obstacle (see hits())
+    def extent(self):
+        if self.type == "rock": return self.size + 14, self.size + 14
+        if self.type == "log": return self.size/2 + 14, 20 + 35
+        return self.size//2 + 14, self.size//2 + 14
+
     def draw(self, screen):
         if self.type == "rock":
-            pygame.draw.circle(screen, ROCK_GRAY, (int(self.pos.x), int(self.pos.y)), self.size)
+            return pygame.draw.circle(screen, ROCK_GRAY, (int(self.pos.x), int(self.pos.y)), self.size)
         elif self.type == "log":
-            pygame.draw.rect(screen, LOG_BROWN,
-                             (self.pos.x - self.size//2, self.pos.y - 10, self.size, 20),
-                             border_radius=5)
+            return pygame.draw.rect(screen, LOG_BROWN,
+                                    (self.pos.x - self.size//2, self.pos.y - 10, self.size, 20),
+                                    border_radius=5)
         else:
-            pygame.draw.circle(screen, BUOY_RED, (int(self.pos.x), int(self.pos.y)), self.size//2)
+            return pygame.draw.circle(screen, BUOY_RED, (int(self.pos.x), int(self.pos.y)), self.size//2)
 
+    # Would a boat centred at pos hit this obstacle?
+    def hits(self, pos):
+        if self.type == "rock" or self.type == "buoy":
+            radius = self.size if self.type=="rock" else self.size//2
+            return pos.distance_to(self.pos) < radius + 14
+        return abs(pos.x - self.pos.x) < self.size/2 + 14 and abs(pos.y - self.pos.y) < 20 + 35
+
+    def update(self, hazards):
         # bobbing animation
         self.offset += 0.03
         self.pos.y += math.sin(self.offset) * 0.3
+        hazards.move(self, self.pos.x, self.pos.y, *self.extent())
 
 # ---------------------------------------------------------
 # Boat class
 # ---------------------------------------------------------
+# One cache of rotated hull sprites per hull colour, shared by every boat
+# of that colour: a full cache is about 1.8 MB
+hulls = {}
+
+def hull_rotations(color):
+    if color not in hulls:
+        image = pygame.Surface((28,70), pygame.SRCALPHA)
+        pygame.draw.polygon(image, color, [(14,0),(0,20),(0,60),(28,60),(28,20)])
+        pygame.draw.rect(image, WHITE, (6,25,16,25), border_radius=4)
+        pygame.draw.rect(image, (10,10,10), (6,15,16,10), border_radius=3)
+        hulls[color] = RotationCache(image, step=3)
+    return hulls[color]
+
 class SpeedBoat:
-    def __init__(self, x, y, color, controls=None):
+    def __init__(self, x, y, color, controls=None, driver=None, name=""):
         self.pos = pygame.Vector2(x, y)
         self.angle = 0
         self.speed = 0
@@ -80,14 +149,12 @@ class SpeedBoat:
         self.boost_power = 4.0
         self.color = color
         self.controls = controls
+        self.driver = driver
+        self.name = name
         self.laps = 0
         self.prev_pos = self.pos.copy()
-        self.wake_particles = []
-
-        self.image = pygame.Surface((28,70), pygame.SRCALPHA)
-        pygame.draw.polygon(self.image, color, [(14,0),(0,20),(0,60),(28,60),(28,20)])
-        pygame.draw.rect(self.image, WHITE, (6,25,16,25), border_radius=4)
-        pygame.draw.rect(self.image, (10,10,10), (6,15,16,10), border_radius=3)
+        self.wake = ParticlePool(WAKE_CAPACITY, emit_every=WAKE_EMIT_EVERY)
+        self.rotations = hull_rotations(color)
 
     # Lap detection
     def update_laps(self):
@@ -96,67 +163,104 @@ class SpeedBoat:
         if crossed: self.laps += 1
         self.prev_pos = self.pos.copy()
 
-    # Player-controlled update
-    def update(self, obstacles):
+    # What is being pressed this frame: the player's keys, or whatever the
+    # CPU driver decides, by control name ('up', 'down', 'left', ...)
+    def read_controls(self):
+        if self.driver:
+            return self.driver.press(self.pos.x, self.pos.y, self.angle, self.speed)
         keys = pygame.key.get_pressed()
-        boosting = keys[self.controls['boost']]
+        return {name: keys[key] for name, key in self.controls.items()}
+
+    # Player- or CPU-controlled update. keys overrides read_controls(),
+    # which is how recorded inputs are fed back in.
+    def update(self, grid, hazards, keys=None):
+        if keys is None: keys = self.read_controls()
+        boosting = keys['boost']
         limit = self.max_speed + (self.boost_power if boosting else 0)
-        if keys[self.controls['up']]: self.speed = min(self.speed + 0.10, limit)
-        elif keys[self.controls['down']]: self.speed = max(self.speed - 0.15, -2)
+        if keys['up']: self.speed = min(self.speed + 0.10, limit)
+        elif keys['down']: self.speed = max(self.speed - 0.15, -2)
         else: self.speed *= 0.98
         if abs(self.speed) > 0.2:
             steer = 1 if self.speed > 0 else -1
-            if keys[self.controls['left']]: self.angle += 3*steer
-            if keys[self.controls['right']]: self.angle -= 3*steer
+            if keys['left']: self.angle += 3*steer
+            if keys['right']: self.angle -= 3*steer
 
         vel = pygame.Vector2(0,-self.speed).rotate(-self.angle)
         self.pos += vel
 
         # Wake particles
         back = pygame.Vector2(0,25).rotate(-self.angle)
-        self.wake_particles.append(WakeParticle(self.pos.x+back.x, self.pos.y+back.y))
-        self.wake_particles = [p for p in self.wake_particles if p.update()]
-
-        # Collision with obstacles
-        for obs in obstacles:
-            if obs.type == "rock" or obs.type == "buoy":
-                radius = obs.size if obs.type=="rock" else obs.size//2
-                if self.pos.distance_to(obs.pos) < radius + 14:
-                    self.speed *= -0.1
-            elif obs.type == "log":
-                if abs(self.pos.x - obs.pos.x) < obs.size/2 + 14 and abs(self.pos.y - obs.pos.y) < 20 + 35:
-                    self.speed *= -0.1
+        self.wake.emit(self.pos.x+back.x, self.pos.y+back.y)
+        self.wake.update()
+
+        # Collision: only boats whose boxes share a grid cell with the boat's
+        # 14 x 35 box, and obstacles whose hit boxes share its centre's cell,
+        # are tested
+        grid.move(self, self.pos.x, self.pos.y, BOAT_RADIUS)
+        for other in grid.query(self.pos.x, self.pos.y, 14, 35):
+            if other is self:
+                continue
+            gap = self.pos - other.pos
+            if 0 < gap.length() < 2*BOAT_RADIUS:
+                self.pos = other.pos + gap.normalize() * 2*BOAT_RADIUS
+                self.speed *= 0.9
+        for obs in hazards.at(self.pos.x, self.pos.y):
+            if obs.hits(self.pos):
+                self.speed *= -0.1
 
         self.update_laps()
 
+    # Returns the rects it drew over
     def draw(self, screen):
-        for p in self.wake_particles: p.draw(screen)
-        rotated = pygame.transform.rotate(self.image, self.angle)
-        rect = rotated.get_rect(center=(self.pos.x,self.pos.y))
-        screen.blit(rotated, rect.topleft)
+        wake = self.wake.draw(screen)
+        boat = self.rotations.blit(screen, self.angle, (self.pos.x,self.pos.y))
+        return wake, boat
 
 # ---------------------------------------------------------
 # Minimap
 # ---------------------------------------------------------
-def draw_minimap(screen, boats):
-    mini_width, mini_height = 120, 120
-    margin = 20
-    pygame.draw.rect(screen, (20,20,20), (WIDTH - mini_width - margin, margin, mini_width, mini_height), border_radius=6)
+MINI_WIDTH, MINI_HEIGHT = 120, 120
+MINI_MARGIN = 20
+MINI_RECT = pygame.Rect(WIDTH - MINI_WIDTH - MINI_MARGIN, MINI_MARGIN, MINI_WIDTH, MINI_HEIGHT)
+
+def minimap_pos(x, y):
+    return (int(MINI_RECT.x + x*MINI_WIDTH/WIDTH), int(MINI_RECT.y + y*MINI_HEIGHT/HEIGHT))
 
-    scale_x = mini_width / WIDTH
-    scale_y = mini_height / HEIGHT
+# The box and track points never change, so they are drawn once
+def make_minimap():
+    surf = pygame.Surface(MINI_RECT.size, pygame.SRCALPHA)
+    pygame.draw.rect(surf, (20,20,20), (0, 0, MINI_WIDTH, MINI_HEIGHT), border_radius=6)
 
     # Track points
     for p in TRACK_POINTS:
-        mx = int((WIDTH - mini_width - margin) + p[0]*scale_x)
-        my = int(margin + p[1]*scale_y)
-        pygame.draw.circle(screen, (150,150,150), (mx,my), 2)
+        mx, my = minimap_pos(*p)
+        pygame.draw.circle(surf, (150,150,150), (mx - MINI_RECT.x, my - MINI_RECT.y), 2)
+    return surf
+
+def draw_minimap(screen, boats):
+    screen.blit(minimap_layer, MINI_RECT)
 
-    # Boats
+    # Boats (a boat off the track can put its dot outside the box)
+    area = MINI_RECT.copy()
     for b in boats:
-        mx = int((WIDTH - mini_width - margin) + b.pos.x*scale_x)
-        my = int(margin + b.pos.y*scale_y)
-        pygame.draw.circle(screen, b.color, (mx,my), 3)
+        area.union_ip(pygame.draw.circle(screen, b.color, minimap_pos(b.pos.x, b.pos.y), 3))
+    return area
+
+# Sand and water never change either; they are rendered once and only the
+# parts of the screen that moving things covered are restored each frame
+def make_background():
+    surf = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surf.fill(SAND)
+
+    # Water
+    pygame.draw.polygon(surf, WATER_COLOR, TRACK_POINTS, 100)
+    pygame.draw.polygon(surf, BUOY_RED, TRACK_POINTS, 120)
+    pygame.draw.polygon(surf, WHITE, TRACK_POINTS, 110)
+
+    # Finish line, and the HUD panel the lap counts are written on
+    pygame.draw.line(surf,WHITE,FINISH_LINE[0],FINISH_LINE[1],6)
+    pygame.draw.rect(surf,(0,0,0),(20,20,500,50),border_radius=5)
+    return surf
 
 # ---------------------------------------------------------
 # Main Loop
@@ -170,78 +274,210 @@ track_mask_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
 pygame.draw.polygon(track_mask_surface, (255,255,255), TRACK_POINTS)
 track_mask = pygame.mask.from_surface(track_mask_surface)
 
-# Generate obstacles only on water
+# Boats and obstacles are kept in separate grids for collision tests
+grid = SpatialHash(GRID_CELL)
+hazards = SpatialHash(GRID_CELL)
+
+# Generate obstacles only on water: every water pixel is indexed once and
+# positions are drawn from that index with a seeded RNG
+water = water_index(track_mask)
+layout_rng = random.Random(SEED)
 obstacles = []
-while len(obstacles) < 12:
-    ox = random.randint(0, WIDTH-1)
-    oy = random.randint(0, HEIGHT-1)
-    if track_mask.get_at((ox, oy)):
-        t = random.choice(["rock","log","buoy"])
-        obstacles.append(Obstacle(ox, oy, t))
+for ox, oy in place(water, OBSTACLE_COUNT, np.random.default_rng(SEED), OBSTACLE_SPACING).tolist():
+    t = layout_rng.choice(["rock","log","buoy"])
+    obstacles.append(Obstacle(ox, oy, t, layout_rng))
+    hazards.insert(obstacles[-1], ox, oy, *obstacles[-1].extent())
 
 # Define controls for both players
 player1_controls = {'up':pygame.K_UP,'down':pygame.K_DOWN,'left':pygame.K_LEFT,'right':pygame.K_RIGHT,'boost':pygame.K_RSHIFT}
 player2_controls = {'up':pygame.K_w,'down':pygame.K_s,'left':pygame.K_a,'right':pygame.K_d,'boost':pygame.K_LSHIFT}
 
-player1 = SpeedBoat(150,325,(255,0,0),controls=player1_controls)
-player2 = SpeedBoat(170,325,(0,0,255),controls=player2_controls)
+player1 = SpeedBoat(150,325,(255,0,0),controls=player1_controls,name="RED")
+player2 = SpeedBoat(170,325,(0,0,255),controls=player2_controls,name="BLUE")
 boats = [player1, player2]
 
+# CPU boats line up three abreast on the racing line behind the start. The
+# racing line and its steering field are computed once here; each CPU boat
+# then only looks up its cell every frame.
+racing_line = RacingLine(TRACK_POINTS, (WIDTH, HEIGHT))
+
+# Where the obstacle a boat centred at (x, y) would hit is, or None. Only
+# the obstacle grid is searched, so the number of boats doesn't change what
+# this costs, and mostly the cell there is empty.
+def hazard_at(x, y):
+    found = hazards.at(x, y)
+    if found:
+        pos = pygame.Vector2(x, y)
+        for obs in found:
+            if obs.hits(pos):
+                return obs.pos.x, obs.pos.y
+    return None
+
+# Grid slots with an obstacle on them are skipped, so no boat starts stuck
+slot = 0
+for i in range(AI_BOATS):
+    while True:
+        (lx, ly), heading = racing_line.point_at(racing_line.length - 60 - (slot//3)*35)
+        side = (slot%3 - 1) * 22
+        rad = math.radians(heading)
+        x, y = lx + side*math.cos(rad), ly - side*math.sin(rad)
+        slot += 1
+        if hazard_at(x, y) is None: break
+    color = CPU_COLORS[i % len(CPU_COLORS)]
+    cpu = SpeedBoat(x, y, color, driver=LineFollower(racing_line, hazard_at), name=f"CPU {i+1}")
+    cpu.angle = heading
+    cpu.prev_pos = cpu.pos.copy()
+    # boats starting behind the finish line score a lap just by crossing it
+    if cpu.pos.y > FINISH_LINE[0][1]: cpu.laps = -1
+    boats.append(cpu)
+
 wave_offset = 0
 winner = None
 
-while True:
-    screen.fill(SAND)
-
-    # Water
-    pygame.draw.polygon(screen, WATER_COLOR, TRACK_POINTS, 100)
-    pygame.draw.polygon(screen, BUOY_RED, TRACK_POINTS, 120)
-    pygame.draw.polygon(screen, WHITE, TRACK_POINTS, 110)
-
-    # Events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            exit()
-
-    # Update boats
+# ---------------------------------------------------------
+# Simulation step, snapshots and input recording
+# ---------------------------------------------------------
+players = [player1, player2]
+CONTROL_NAMES = ('up','down','left','right','boost')
+CHANNELS = [f"{b.name}.{c}" for b in players for c in CONTROL_NAMES]
+
+# Advance the race by one frame. pressed maps each player boat to the
+# controls it is pressing; CPU boats decide for themselves.
+def step_frame(pressed):
+    global winner
     if winner is None:
-        for b in boats: b.update(obstacles)
+        for b in boats: b.update(grid, hazards, pressed.get(b))
         for b in boats:
             if b.laps >= 3:
                 winner = b
                 break
 
-    # Draw obstacles
-    for obs in obstacles: obs.draw(screen)
+    # bobbing animation
+    for obs in obstacles: obs.update(hazards)
 
-    # Finish line
-    pygame.draw.line(screen,WHITE,FINISH_LINE[0],FINISH_LINE[1],6)
+def pressed_from_log(frame, channels):
+    return {b: {c: channels[f"{b.name}.{c}"] for c in CONTROL_NAMES} for b in players}
 
-    # Draw boats
-    for b in boats: b.draw(screen)
+# Everything the simulation needs to carry on from a frame (wakes are only
+# decoration and are left out)
+def save_state():
+    return (
+        boats.index(winner) if winner else None,
+        [(b.pos.x, b.pos.y, b.angle, b.speed, b.laps, b.prev_pos.x, b.prev_pos.y,
+          (b.driver.stopped, b.driver.reversing, b.driver.side) if b.driver else None) for b in boats],
+        [(o.pos.y, o.offset) for o in obstacles],
+    )
 
-    # Minimap
-    draw_minimap(screen, boats)
+def load_state(state):
+    global winner
+    win, boat_states, obstacle_states = state
+    winner = boats[win] if win is not None else None
+    for b, (x, y, angle, speed, laps, px, py, driver) in zip(boats, boat_states):
+        b.pos.update(x, y)
+        b.prev_pos.update(px, py)
+        b.angle, b.speed, b.laps = angle, speed, laps
+        if driver: b.driver.stopped, b.driver.reversing, b.driver.side = driver
+        grid.move(b, x, y, BOAT_RADIUS)
+    for o, (y, offset) in zip(obstacles, obstacle_states):
+        o.pos.y, o.offset = y, offset
+        hazards.move(o, o.pos.x, o.pos.y, *o.extent())
+
+recorder = InputRecorder(CHANNELS, SEED, SNAPSHOT_EVERY, {"ai": AI_BOATS}) if RECORD else None
+replay = None
+if REPLAY is not None:
+    replay = Replay(REPLAY, lambda frame, channels: step_frame(pressed_from_log(frame, channels)), load_state)
+    replay.seek(SEEK)
+
+profiler = FrameProfiler(budget=1 / FPS, csv_path=PROFILE)
+
+def finish():
+    if recorder is not None:
+        recorder.save(RECORD)
+    profiler.close()
+    pygame.quit()
+    exit()
 
-    # HUD
-    pygame.draw.rect(screen,(0,0,0),(20,20,500,50),border_radius=5)
-    font = pygame.font.SysFont("Verdana",18,bold=True)
-    laps_text = font.render(
-        f"RED: {player1.laps} | BLUE: {player2.laps}",
-        True,WHITE
-    )
-    screen.blit(laps_text,(35,33))
-
-    # Winner
-    if winner:
-        big_font = pygame.font.SysFont("Verdana",72,bold=True)
-        win_txt = big_font.render(
-            f"{'RED' if winner==player1 else 'BLUE'} WINS!",
-            True,(255,255,0)
-        )
-        screen.blit(win_txt,(WIDTH//2 - win_txt.get_width()//2,
-                             HEIGHT//2 - win_txt.get_height()//2))
+# ---------------------------------------------------------
+# Headless run: simulate only, as fast as possible
+# ---------------------------------------------------------
+if HEADLESS:
+    frame = 0
+    start = time.perf_counter()
+    while (replay and not replay.done()) or (not replay and frame < FRAMES and winner is None):
+        if replay: replay.advance()
+        else: step_frame({})
+        frame += 1
+    took = time.perf_counter() - start
+    print(f"{frame} frames in {took:.3f}s ({frame / FPS / took:.0f}x real time at {FPS} FPS)")
+    print(" | ".join(f"{b.name}: {b.laps}" for b in boats), f"| winner: {winner.name if winner else '-'}")
+    finish()
+
+minimap_layer = make_minimap()
+dirty = DirtyRects(screen, make_background())
+
+frame = 0
+while True:
+    profiler.frame()
+    frame += 1
+    if frame > FRAMES > 0:
+        finish()
 
-    pygame.display.flip()
+    with profiler.phase("draw"):
+        # Put the background back where things were drawn last frame
+        dirty.restore()
+
+    # Events
+    with profiler.phase("event"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                finish()
+            if event.type == pygame.WINDOWEXPOSED:
+                dirty.invalidate()
+            profiler.handle(event)
+
+    # Update the race, from the log when replaying
+    with profiler.phase("update"):
+        if replay:
+            if replay.done(): finish()
+            replay.advance()
+        else:
+            pressed = {b: b.read_controls() for b in players}
+            if recorder is not None:
+                if recorder.wants_snapshot(): recorder.snapshot(save_state())
+                recorder.record(pressed[b][c] for b in players for c in CONTROL_NAMES)
+            step_frame(pressed)
+
+    with profiler.phase("draw"):
+        # Draw obstacles
+        for obs in obstacles:
+            dirty.mark(obs.draw(screen))
+
+        # Draw boats
+        for b in boats: dirty.mark(*b.draw(screen))
+
+        # Minimap
+        dirty.mark(draw_minimap(screen, boats))
+
+        # HUD (the panel is part of the background)
+        font = get_font("Verdana",18,bold=True)
+        laps_text = render_text(
+            f"RED: {player1.laps} | BLUE: {player2.laps}",
+            font,WHITE
+        )
+        dirty.mark(screen.blit(laps_text,(35,33)))
+
+        # Winner
+        if winner:
+            big_font = get_font("Verdana",72,bold=True)
+            win_txt = render_text(
+                f"{winner.name} WINS!",
+                big_font,(255,255,0)
+            )
+            dirty.mark(screen.blit(win_txt,(WIDTH//2 - win_txt.get_width()//2,
+                                            HEIGHT//2 - win_txt.get_height()//2)))
+    dirty.mark(profiler.draw(screen, (20, HEIGHT - 190)))
+
+    # Only the regions drawn this frame or last frame go to the display
+    with profiler.phase("flip"):
+        dirty.update()
     clock.tick(FPS)
@@ -1,5 +1,15 @@
 import pygame, math, sys, random, os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gfx.raycast import cast_rays, render_view
+from gfx.billboard import ScaleCache, draw_sprites
+from gfx.governor import ResolutionGovernor
+from gfx.tilemap import TileMap
+from gfx.audio import AudioManager
+from gfx.cli import arg
+from gfx.profiler import FrameProfiler
+import numpy as np
+
 pygame.init()
 WIDTH, HEIGHT = 800, 600
 window = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -7,19 +17,22 @@ pygame.display.set_caption("Haunted House Stickman Edition")
 clock = pygame.time.Clock()
 
 # --- Sounds ---
+# Stickmen trigger sounds by distance and the audio manager decides what
+# plays: at most AUDIO_CHANNELS at once, nearest first, no restarting a sound
+# that is still playing for the same stickman.
+AUDIO_CHANNELS = 4
 pygame.mixer.init()
-ghost_sound = None
-jump_scare_sound = None
+audio = AudioManager(AUDIO_CHANNELS)
 
 if os.path.exists("ghost.mp3"):
-    ghost_sound = pygame.mixer.Sound("ghost.mp3")
-    ghost_sound.set_volume(100)
+    audio.add("ghost", pygame.mixer.Sound("ghost.mp3"), radius=120, near=30, cooldown=1500)
 
 if os.path.exists("jumpscare.mp3"):
-    jump_scare_sound = pygame.mixer.Sound("jumpscare.mp3")
-    jump_scare_sound.set_volume(100)
+    audio.add("jumpscare", pygame.mixer.Sound("jumpscare.mp3"), radius=50, near=50, cooldown=3000, priority=1,
+              follow=False)
 
 # --- Map ---
+# The built-in house, or a map file saved with gfx.tilemap: --map FILE
 FLOOR = [
     [1,1,1,1,1,1,1,1,1],
     [1,0,0,0,0,0,0,0,1],
@@ -29,8 +42,10 @@ FLOOR = [
     [1,1,1,1,1,1,1,1,1]
 ]
 
-MAP_WIDTH = len(FLOOR[0])
-MAP_HEIGHT = len(FLOOR)
+MAP_FILE = arg("--map")
+LEVEL = TileMap.load(MAP_FILE) if MAP_FILE else TileMap.from_rows(FLOOR)
+MAP_WIDTH = LEVEL.cols
+MAP_HEIGHT = LEVEL.rows
 TILE = 64
 
 # Player
@@ -46,11 +61,17 @@ CEILING_COLOR = (20,20,20)
 FLOOR_COLOR = (40,40,40)
 
 FOV = math.pi/3
-NUM_RAYS = 120
 MAX_DEPTH = 800
-DELTA_ANGLE = FOV / NUM_RAYS
-DIST_PROJ_PLANE = (WIDTH/2)/math.tan(FOV/2)
-SCALE = WIDTH // NUM_RAYS
+
+# --- Render resolution ---
+# The view is rendered offscreen with one ray per column and scaled up to the
+# window. The governor picks the offscreen size, between RENDER_SCALE_MIN and
+# RENDER_SCALE_MAX of the window, so drawing stays within RENDER_BUDGET.
+RENDER_BUDGET = 0.010  # seconds per frame for casting and drawing
+RENDER_SCALE_MIN = 0.25
+RENDER_SCALE_MAX = 1.0
+governor = ResolutionGovernor(RENDER_BUDGET, RENDER_SCALE_MIN, RENDER_SCALE_MAX)
+view = window
 
 # ------------- STICKMAN GENERATOR --------------
 def make_stickman(size):
@@ -67,13 +88,15 @@ def make_stickman(size):
 
 # Scale stickmen to 75% of previous TILE//1.5 size
 STICKMAN = make_stickman(int(TILE//1.5 * 0.75))
+# Every stickman shares one set of scaled copies
+STICKMAN_SCALES = ScaleCache(STICKMAN)
 
 # ------------- STICKMAN CLASS ---------------
 class StickmanMove:
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.sprite = STICKMAN
+        self.sprite = STICKMAN_SCALES
         self.dx = random.choice([-1,1])
         self.dy = random.choice([-1,1])
         self.jump_triggered = False
@@ -81,7 +104,7 @@ class StickmanMove:
     def move(self):
         nx = self.x + self.dx*0.4
         ny = self.y + self.dy*0.4
-        if FLOOR[int(ny//TILE)][int(nx//TILE)] == 0:
+        if not LEVEL.solid_at(nx, ny, TILE):
             self.x, self.y = nx, ny
         else:
             self.dx *= -1
@@ -96,85 +119,100 @@ stickmen = [
 ]
 
 # ---------------- RAYCAST --------------------
-def raycast():
-    start_angle = player_angle - FOV/2
-
-    for ray in range(NUM_RAYS):
-        angle = start_angle + ray*DELTA_ANGLE
-        sin_a = math.sin(angle)
-        cos_a = math.cos(angle)
-
-        for depth in range(MAX_DEPTH):
-            x = player_x + cos_a * depth
-            y = player_y + sin_a * depth
-
-            i = int(x//TILE)
-            j = int(y//TILE)
-
-            if FLOOR[j][i] == 1:
-                h = min(int(DIST_PROJ_PLANE*TILE/(depth+0.01)), HEIGHT)
-                pygame.draw.rect(window, (80,80,80), (ray*SCALE, HEIGHT/2 - h/2, SCALE, h))
-                break
+# All rays of the frame are cast together, each stepping from one tile edge
+# to the next until it reaches a wall. Distances are projected onto the view
+# direction (depth * cos of the ray's offset from it) so walls facing the
+# player don't bulge (fisheye). Walls, ceiling and floor are then written
+# straight into the view's pixels. Returns the wall depth of every column.
+def raycast(view):
+    num_rays = view.get_width()
+    dist_proj_plane = (num_rays/2)/math.tan(FOV/2)
+    offsets = np.arange(num_rays)*(FOV/num_rays) - FOV/2
+    distance, side, u = cast_rays(LEVEL.tiles, TILE, player_x, player_y, player_angle + offsets, MAX_DEPTH, LEVEL.field)
+    depth = distance * np.cos(offsets)
+    return render_view(view, depth, dist_proj_plane, TILE, (80,80,80), CEILING_COLOR, FLOOR_COLOR)
 
 # ---------------- SPRITE PROJECTION ----------------
-def draw_sprite(x, y, sprite):
-    dx, dy = x - player_x, y - player_y
-    dist = math.hypot(dx, dy)
-    ang = math.atan2(dy, dx)
-    gamma = ang - player_angle
-
-    if -FOV/2 < gamma < FOV/2:
-        h = min(int(DIST_PROJ_PLANE*TILE/(dist+0.01)), HEIGHT)
-        screen_x = int((WIDTH/2)*(1 + math.tan(gamma)/math.tan(FOV/2))) - h//2
-        sp = pygame.transform.scale(sprite, (h, h))
-        window.blit(sp, (screen_x, HEIGHT//2 - h//2))
-        return dist
-    return None
+# Stickmen are drawn far to near and only where they are in front of the
+# walls; each gets back its distance when it is on screen, else None.
+def draw_stickmen(view, zbuf):
+    sprites = [(s.x, s.y, s.sprite) for s in stickmen]
+    return draw_sprites(view, sprites, zbuf, player_x, player_y, player_angle, FOV, TILE)
 
 # ---------------- MAIN LOOP ----------------
+# F3 shows the frame-time overlay; --profile FILE writes the timings as CSV
+# and --frames N quits after N frames
+PROFILE = arg("--profile")
+FRAMES = int(arg("--frames", 0))
+profiler = FrameProfiler(("event", "update", "draw", "audio", "flip"), csv_path=PROFILE)
+
 running = True
+frame = 0
 while running:
-    window.fill(FLOOR_COLOR)
-    pygame.draw.rect(window, CEILING_COLOR, (0,0,WIDTH,HEIGHT//2))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_LEFT]: player_angle -= 0.03
-    if keys[pygame.K_RIGHT]: player_angle += 0.03
-
-    if keys[pygame.K_UP]:
-        nx = player_x + player_speed*math.cos(player_angle)
-        ny = player_y + player_speed*math.sin(player_angle)
-        if FLOOR[int(ny//TILE)][int(nx//TILE)] == 0:
-            player_x, player_y = nx, ny
-
-    if keys[pygame.K_DOWN]:
-        nx = player_x - player_speed*math.cos(player_angle)
-        ny = player_y - player_speed*math.sin(player_angle)
-        if FLOOR[int(ny//TILE)][int(nx//TILE)] == 0:
-            player_x, player_y = nx, ny
-
-    raycast()
+    profiler.frame()
+    frame += 1
+    if frame == FRAMES:
+        running = False
+
+    with profiler.phase("event"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            profiler.handle(event)
+
+    with profiler.phase("update"):
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_LEFT]: player_angle -= 0.03
+        if keys[pygame.K_RIGHT]: player_angle += 0.03
+
+        if keys[pygame.K_UP]:
+            nx = player_x + player_speed*math.cos(player_angle)
+            ny = player_y + player_speed*math.sin(player_angle)
+            if not LEVEL.solid_at(nx, ny, TILE):
+                player_x, player_y = nx, ny
+
+        if keys[pygame.K_DOWN]:
+            nx = player_x - player_speed*math.cos(player_angle)
+            ny = player_y - player_speed*math.sin(player_angle)
+            if not LEVEL.solid_at(nx, ny, TILE):
+                player_x, player_y = nx, ny
+
+        for s in stickmen:
+            s.move()
+
+    with profiler.phase("draw"):
+        governor.begin()
+        size = governor.size(WIDTH, HEIGHT)
+        if view.get_size() != size:
+            view = window if size == (WIDTH, HEIGHT) else pygame.Surface(size).convert()
+        zbuf = raycast(view)
+        seen = draw_stickmen(view, zbuf)
+        if view is not window:
+            pygame.transform.scale(view, (WIDTH, HEIGHT), window)
+        governor.end()
+    profiler.draw(window)
 
     # stickmen
-    for s in stickmen:
-        s.move()
-        dist = draw_sprite(s.x, s.y, s.sprite)
-
-        if dist and ghost_sound and dist < 120:
-            ghost_sound.play()
-
-        if dist and jump_scare_sound and dist < 50 and not s.jump_triggered:
-            jump_scare_sound.play()
-            s.jump_triggered = True
-        else:
-            s.jump_triggered = False
-
-    pygame.display.flip()
+    with profiler.phase("audio"):
+        for s, dist in zip(stickmen, seen):
+            if dist is None:
+                s.jump_triggered = False
+                continue
+            audio.trigger(s, "ghost", dist)
+
+            # The jump scare goes off once per approach, not every frame
+            if dist < 50:
+                if not s.jump_triggered:
+                    audio.trigger(s, "jumpscare", dist)
+                    s.jump_triggered = True
+            else:
+                s.jump_triggered = False
+        audio.update()
+
+    with profiler.phase("flip"):
+        pygame.display.flip()
     clock.tick(60)
 
+profiler.close()
 pygame.quit()
 sys.exit()
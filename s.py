@@ -1,31 +1,24 @@
 import pygame
 import sys
+from gfx.raster import dda_lines
+from gfx.scene import Scene, run
 pygame.init() 
 w,h=800,600 
 screen = pygame.display.set_mode((w, h))
 white = (255, 255, 255)
 black = (0, 0, 0)
 
-def draw(x1, y1, x2, y2):
-    
-    dx=x2 - x1
-    dy=y2 - y1
-    if abs(dx) > abs(dy):
-        step=abs(dx)
-    else:
-        step=abs(dy)    
-    xinc=dx/step
-    yinc=dy/step
-    x,y=x1,y1
-    for i in range(step+1):
-        screen.set_at((round(x), round(y)), white)
-        x+=xinc
-        y+=yinc   
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-    screen.fill(black)
-    draw(40,40,120,120)
-    pygame.display.flip()        
\ No newline at end of file
+def draw(x1, y1, x2, y2, surface=None):
+    dda_lines(screen if surface is None else surface, [(x1, y1, x2, y2)], white)
+
+# Many lines in one call: lines is an (N,4) array of x1,y1,x2,y2.
+# Lines are clipped to clip (x,y,w,h), or the screen, before drawing.
+def draw_batch(lines, clip=None):
+    dda_lines(screen, lines, white, clip)
+
+# Drawn once into a cached scene; the loop sleeps until something happens.
+scene = Scene((w, h), black)
+scene.add(lambda surface: draw(40, 40, 120, 120, surface))
+run(screen, scene)
+pygame.quit()
+sys.exit()
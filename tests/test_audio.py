@@ -0,0 +1,85 @@
+# AudioManager on SDL's dummy audio driver.
+
+import os
+
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import numpy as np
+import pygame
+import pytest
+
+from gfx.audio import AudioManager
+
+
+@pytest.fixture
+def audio():
+    pygame.mixer.init(44100, -16, 2)
+    manager = AudioManager(2)
+    # ten seconds of silence, so nothing ends on its own during a test
+    sound = pygame.sndarray.make_sound(np.zeros((441000, 2), dtype=np.int16))
+    manager.add("hum", sound, radius=100, near=0, cooldown=0)
+    manager.add("alarm", sound, radius=100, near=0, cooldown=5000, priority=1)
+    manager.add("scare", sound, radius=100, near=0, cooldown=5000, priority=1, follow=False)
+    yield manager
+    manager.stop()
+    pygame.mixer.quit()
+
+
+def voice(manager, source):
+    return next((v for v in manager.voices if v is not None and v[0] == source), None)
+
+
+def test_volume_follows_distance(audio):
+    audio.trigger("a", "hum", 20)
+    audio.update(0)
+    i = audio.voices.index(voice(audio, "a"))
+    assert audio.channels[i].get_volume() == pytest.approx(0.8, abs=0.01)
+    audio.trigger("a", "hum", 60)
+    audio.update(16)
+    assert voice(audio, "a") == ("a", "hum", 60)
+    assert audio.channels[i].get_volume() == pytest.approx(0.4, abs=0.01)
+
+
+def test_untriggered_voice_is_released(audio):
+    audio.trigger("a", "hum", 20)
+    audio.trigger("b", "hum", 30)
+    audio.update(0)
+    audio.trigger("b", "hum", 30)
+    audio.update(16)
+    # "a" went out of earshot: its channel is fading out and free again
+    assert voice(audio, "a") is None
+    assert voice(audio, "b") == ("b", "hum", 30)
+    audio.trigger("b", "hum", 30)
+    audio.trigger("c", "hum", 90)
+    audio.update(32)
+    assert voice(audio, "c") == ("c", "hum", 90)
+
+
+def test_one_shot_plays_out(audio):
+    # triggered on one frame only, as the jump scare is
+    audio.trigger("a", "scare", 20)
+    audio.update(0)
+    i = audio.voices.index(voice(audio, "a"))
+    for now in range(16, 1000, 16):
+        audio.update(now)
+        assert voice(audio, "a") == ("a", "scare", 20)
+        assert audio.channels[i].get_busy()
+        assert audio.channels[i].get_volume() == pytest.approx(0.8, abs=0.01)
+
+
+def test_outranked_voice_keeps_up(audio):
+    audio.trigger("a", "hum", 50)
+    audio.trigger("b", "hum", 60)
+    audio.update(0)
+    # "alarm" outranks both but is cooling down, so "b" keeps its channel
+    # and its new distance
+    audio.started[("x", "alarm")] = 0
+    audio.started[("y", "alarm")] = 0
+    audio.trigger("x", "alarm", 10)
+    audio.trigger("y", "alarm", 10)
+    audio.trigger("a", "hum", 50)
+    audio.trigger("b", "hum", 10)
+    audio.update(16)
+    assert voice(audio, "b") == ("b", "hum", 10)
+    i = audio.voices.index(voice(audio, "b"))
+    assert audio.channels[i].get_volume() == pytest.approx(0.9, abs=0.01)
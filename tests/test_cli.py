@@ -0,0 +1,16 @@
+# Option values from the command line, and what a missing value falls back to.
+
+from gfx.cli import arg
+
+
+def test_value_follows_option():
+    argv = ["game.py", "--profile", "out.csv", "--frames", "10"]
+    assert arg("--profile", argv=argv) == "out.csv"
+    assert arg("--frames", 0, argv) == "10"
+    assert arg("--map", argv=argv) is None
+
+
+def test_missing_value_gives_default():
+    # the option last, or followed by another option
+    assert arg("--profile", argv=["game.py", "--profile"]) is None
+    assert arg("--frames", 0, ["game.py", "--frames", "--headless"]) == 0
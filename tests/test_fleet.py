@@ -0,0 +1,27 @@
+# Fleet.step() must move every car exactly as gfx.car.step() moves one car.
+
+import numpy as np
+
+from gfx.car import CarInput, CarParams, CarState, step
+from gfx.fleet import Fleet
+
+
+def test_matches_single_car_model():
+    rng = np.random.default_rng(0)
+    n, ticks = 500, 400
+    params = CarParams(acceleration=0.15, friction=0.04, max_speed=10, steering=3.5)
+    cars = [CarState(*rng.uniform(-500, 500, 2), rng.uniform(-180, 180), rng.uniform(-5, 10))
+            for _ in range(n)]
+    fleet = Fleet.from_states(cars, params)
+
+    for t in range(ticks):
+        # random keys every tick, sometimes up and down together, and now and
+        # then an uneven dt
+        keys = rng.random((4, n)) < [[0.6], [0.3], [0.4], [0.4]]
+        dt = 1 / 60 if t % 50 else rng.uniform(1 / 240, 1 / 20)
+        fleet.step(*keys, dt=dt)
+        cars = [step(car, CarInput(*k), params, dt) for car, k in zip(cars, keys.T.tolist())]
+
+    for i, car in enumerate(cars):
+        got = fleet.state(i)
+        assert (got.x, got.y, got.angle, got.speed) == (car.x, car.y, car.angle, car.speed), i
@@ -0,0 +1,106 @@
+# bla_lines() must draw exactly the pixels of the original per-pixel loop,
+# and dda_lines() must round every step of the line exactly.
+
+from fractions import Fraction
+from math import floor
+
+import numpy as np
+
+from gfx.raster import bla_points, dda_points
+
+
+def bla_loop(x1, y1, x2, y2):
+    # The original bla() from bla.py, collecting pixels instead of set_at()
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    lx = 1 if x2 > x1 else -1
+    ly = 1 if y2 > y1 else -1
+    x, y = x1, y1
+    out = []
+    if dx > dy:
+        pk = 2 * dy - dx
+        for _ in range(dx):
+            if pk < 0:
+                x += lx
+                pk += 2 * dy
+            else:
+                x += lx
+                y += ly
+                pk += 2 * dy - 2 * dx
+            out.append((x, y))
+    else:
+        pk = 2 * dx - dy
+        for _ in range(dy):
+            if pk < 0:
+                y += ly
+                pk += 2 * dx
+            else:
+                y += ly
+                x += lx
+                pk += 2 * dx - 2 * dy
+            out.append((x, y))
+    return out
+
+
+def random_lines(n, lo, hi, seed=0):
+    return np.random.default_rng(seed).integers(lo, hi, (n, 4))
+
+
+SPECIAL = [
+    (5, 5, 5, 5),       # a single point
+    (0, 0, 10, 0),      # horizontal, both ways
+    (10, 0, 0, 0),
+    (3, 0, 3, 12),      # vertical, both ways
+    (3, 12, 3, 0),
+    (0, 0, 9, 9),       # diagonals
+    (9, 0, 0, 9),
+    (0, 0, 1, 0),
+    (0, 0, 10, 5),      # exact half steps
+    (10, 5, 0, 0),
+]
+
+
+def test_matches_loop_line_by_line():
+    for line in SPECIAL + random_lines(500, -50, 300).tolist():
+        xs, ys = bla_points([line])
+        assert list(zip(xs.tolist(), ys.tolist())) == bla_loop(*line), line
+
+
+def test_matches_loop_batched():
+    lines = np.array(SPECIAL + random_lines(2000, -300, 300, seed=1).tolist())
+    xs, ys = bla_points(lines)
+    expected = [p for line in lines.tolist() for p in bla_loop(*line)]
+    assert list(zip(xs.tolist(), ys.tolist())) == expected
+
+
+def test_clipped_lines_keep_every_visible_pixel():
+    # Lines partly or wholly off a 100x80 rect: clipping may only drop pixels
+    # outside it
+    rect = (10, 20, 100, 80)
+    x0, y0, w, h = rect
+    lines = np.array(SPECIAL + random_lines(2000, -200, 300, seed=2).tolist())
+    xs, ys = bla_points(lines, rect)
+    inside = (xs >= x0) & (xs < x0 + w) & (ys >= y0) & (ys < y0 + h)
+    got = sorted(zip(xs[inside].tolist(), ys[inside].tolist()))
+    expected = sorted((x, y) for line in lines.tolist() for x, y in bla_loop(*line)
+                      if x0 <= x < x0 + w and y0 <= y < y0 + h)
+    assert got == expected
+
+
+def dda_exact(x1, y1, x2, y2):
+    # x1 + dx*i/step rounded to nearest, .5 rounding up, in exact fractions
+    step = max(abs(x2 - x1), abs(y2 - y1))
+    if step == 0:
+        return [(x1, y1)]
+    return [(x1 + floor(Fraction(x2 - x1) * i / step + Fraction(1, 2)),
+             y1 + floor(Fraction(y2 - y1) * i / step + Fraction(1, 2))) for i in range(step + 1)]
+
+
+def test_dda_rounds_exactly():
+    lines = np.array(SPECIAL + random_lines(300, -300, 300, seed=3).tolist())
+    xs, ys = dda_points(lines)
+    # single-point lines come first, then the rest in order
+    point = [l for l in lines.tolist() if l[0] == l[2] and l[1] == l[3]]
+    rest = [l for l in lines.tolist() if not (l[0] == l[2] and l[1] == l[3])]
+    expected = [p for line in point + rest for p in dda_exact(*line)]
+    assert list(zip(xs.tolist(), ys.tolist())) == expected
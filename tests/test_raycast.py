@@ -0,0 +1,108 @@
+# The distance field and the rays that use it must see the same walls as a
+# plain walk through the map.
+
+import math
+
+import numpy as np
+import pytest
+
+from gfx.raycast import SIDE_X, cast_ray, cast_rays
+from gfx.tilemap import distance_field
+
+TILE = 16
+
+
+def random_map(seed, rows=30, cols=40, walls=0.08):
+    rng = np.random.default_rng(seed)
+    tiles = (rng.random((rows, cols)) < walls).astype(np.uint8)
+    # a few solid blocks, so there is open space and walls of some size
+    for _ in range(6):
+        r, c = rng.integers(0, rows - 4), rng.integers(0, cols - 4)
+        tiles[r:r + rng.integers(1, 5), c:c + rng.integers(1, 5)] = 1
+    return tiles
+
+
+def brute_field(tiles, cap):
+    # Chebyshev distance to the nearest wall, with a ring of wall around
+    # the map
+    rows, cols = tiles.shape
+    walled = np.ones((rows + 2, cols + 2), dtype=np.uint8)
+    walled[1:-1, 1:-1] = tiles
+    wr, wc = np.nonzero(walled)
+    r, c = np.mgrid[1:rows + 1, 1:cols + 1]
+    d = np.maximum(abs(r[..., None] - wr), abs(c[..., None] - wc)).min(axis=-1)
+    return np.minimum(d, cap)
+
+
+def open_spot(tiles, rng):
+    rows, cols = tiles.shape
+    while True:
+        x, y = rng.uniform(0, cols * TILE), rng.uniform(0, rows * TILE)
+        if not tiles[int(y // TILE), int(x // TILE)]:
+            return x, y
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_field_matches_brute_force(seed):
+    tiles = random_map(seed)
+    assert np.array_equal(distance_field(tiles), brute_field(tiles, 255))
+    # open maps hit the cap
+    tiles[1:-1, 1:-1] = 0
+    tiles[15, 20] = 1
+    assert np.array_equal(distance_field(tiles, cap=6), brute_field(tiles, 6))
+    assert np.array_equal(distance_field(np.zeros((3, 5), np.uint8)), [[1] * 5, [1, 2, 2, 2, 1], [1] * 5])
+
+
+def test_field_does_not_change_hits():
+    rng = np.random.default_rng(7)
+    tiles = random_map(7, rows=60, cols=80, walls=0.02)
+    field = distance_field(tiles)
+    for _ in range(20):
+        x, y = open_spot(tiles, rng)
+        angles = rng.uniform(-math.pi, math.pi, 200)
+        # axis-aligned rays too
+        angles[:4] = 0, math.pi / 2, math.pi, -math.pi / 2
+        plain = cast_rays(tiles, TILE, x, y, angles, max_depth=600)
+        skipped = cast_rays(tiles, TILE, x, y, angles, max_depth=600, field=field)
+        assert np.array_equal(np.isinf(plain[0]), np.isinf(skipped[0]))
+        hit = ~np.isinf(plain[0])
+        np.testing.assert_allclose(skipped[0][hit], plain[0][hit], rtol=1e-9)
+        assert np.array_equal(skipped[1][hit], plain[1][hit])
+        for a in angles[:20]:
+            one, other = cast_ray(tiles, TILE, x, y, a, 600), cast_ray(tiles, TILE, x, y, a, 600, field)
+            assert (one is None) == (other is None)
+            if one is not None:
+                assert (other.col, other.row, other.side) == (one.col, one.row, one.side)
+                assert other.distance == pytest.approx(one.distance, rel=1e-9)
+
+
+def test_scalar_and_vector_hits_agree():
+    rng = np.random.default_rng(3)
+    tiles = random_map(3)
+    field = distance_field(tiles)
+    for _ in range(10):
+        x, y = open_spot(tiles, rng)
+        angles = rng.uniform(-math.pi, math.pi, 50)
+        distance, side, u = cast_rays(tiles, TILE, x, y, angles, field=field)
+        for a, d, s, v in zip(angles, distance, side, u):
+            hit = cast_ray(tiles, TILE, x, y, a, field=field)
+            if hit is None:
+                assert np.isinf(d)
+                continue
+            assert (hit.distance, hit.side) == (pytest.approx(d, rel=1e-9), s)
+            assert min(abs(hit.u - v), 1 - abs(hit.u - v)) < 1e-6
+
+            # The distance is exact: the hit point is on the face of the wall
+            # tile it reports, and nothing before it is wall
+            hx, hy = x + hit.distance * math.cos(a), y + hit.distance * math.sin(a)
+            assert tiles[hit.row, hit.col]
+            if hit.side == SIDE_X:
+                face, across, cell, span = hx, hy, hit.col, hit.row
+            else:
+                face, across, cell, span = hy, hx, hit.row, hit.col
+            assert min(abs(face - cell * TILE), abs(face - (cell + 1) * TILE)) < 1e-6
+            assert span * TILE - 1e-6 <= across <= (span + 1) * TILE + 1e-6
+            t = np.arange(0, hit.distance - 1e-6, 0.01)
+            cols = ((x + t * math.cos(a)) // TILE).astype(int)
+            rows = ((y + t * math.sin(a)) // TILE).astype(int)
+            assert not tiles[rows, cols].any()
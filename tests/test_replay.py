@@ -0,0 +1,57 @@
+# Input logs come back as they were recorded, without pickle.
+
+import numpy as np
+import pytest
+
+from gfx.replay import VERSION, InputLog, InputRecorder, Replay
+
+
+def recorded(tmp_path, channels=("a.up", "a.down", "b.up"), frames=50):
+    rng = np.random.default_rng(5)
+    rec = InputRecorder(channels, seed=42, snapshot_every=10, meta={"ai": 3, "track": "lake"})
+    presses = (rng.random((frames, len(channels))) < 0.5).tolist()
+    for i, pressed in enumerate(presses):
+        if rec.wants_snapshot():
+            rec.snapshot([i, [0.1 * i, None], (1, 2.5)])
+        rec.record(pressed)
+    path = tmp_path / "session.inpl"
+    rec.save(path)
+    return path, presses
+
+
+def test_round_trip(tmp_path):
+    path, presses = recorded(tmp_path)
+    log = InputLog.load(path)
+    assert log.channels == ["a.up", "a.down", "b.up"]
+    assert log.seed == 42
+    assert log.meta == {"ai": 3, "track": "lake"}
+    assert log.unpacked().tolist() == presses
+    assert log.pressed(3) == dict(zip(log.channels, presses[3]))
+    # snapshots are JSON: tuples come back as lists, floats exactly
+    assert log.snapshot_frames == [0, 10, 20, 30, 40]
+    assert log.snapshot_before(27) == (20, [20, [0.1 * 20, None], [1, 2.5]])
+    assert log.snapshot_before(-1) is None
+
+
+def test_seek_restores_snapshot(tmp_path):
+    path, presses = recorded(tmp_path)
+    stepped, restored = [], []
+    replay = Replay(InputLog.load(path), lambda frame, pressed: stepped.append(frame), restored.append)
+    replay.seek(35)
+    assert restored == [[30, [0.1 * 30, None], [1, 2.5]]]
+    assert stepped == [30, 31, 32, 33, 34]
+
+
+def test_unencodable_state_fails_while_recording():
+    rec = InputRecorder(["a"], snapshot_every=1)
+    with pytest.raises(TypeError):
+        rec.snapshot(object())
+
+
+def test_old_logs_are_refused(tmp_path):
+    path, _ = recorded(tmp_path)
+    data = bytearray(path.read_bytes())
+    data[4:6] = (VERSION - 1).to_bytes(2, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        InputLog.load(path)
@@ -0,0 +1,52 @@
+# Timeline tracks changed from on_done callbacks.
+
+from gfx.tween import Timeline
+
+
+def test_runs_to_end():
+    timeline = Timeline()
+    state = {"x": 0.0}
+    timeline.add(state, "x", 0.0, 10.0, 1.0)
+    timeline.update(0.5)
+    assert state["x"] == 5.0
+    timeline.update(0.6)
+    assert state["x"] == 10.0
+    assert len(timeline) == 0
+
+
+def test_chain_from_on_done():
+    timeline = Timeline()
+    state = {"x": 0.0, "y": 0.0}
+    timeline.add(state, "x", 0.0, 1.0, 1.0,
+                 on_done=lambda: timeline.add(state, "y", 0.0, 4.0, 1.0))
+    timeline.update(1.0)
+    # the next tween is there, and starts on the next frame
+    assert len(timeline) == 1
+    assert state == {"x": 1.0, "y": 0.0}
+    timeline.update(0.5)
+    assert state["y"] == 2.0
+
+
+def test_cancel_from_on_done():
+    timeline = Timeline()
+    state = {"a": 0.0, "b": 0.0}
+    ta = timeline.add(state, "a", 0.0, 10.0, 2.0)
+    timeline.add(state, "b", 0.0, 1.0, 1.0, on_done=lambda: timeline.cancel(ta))
+    # ta was already updated this frame when tb's on_done cancels it
+    timeline.update(1.0)
+    assert ta not in timeline.tracks
+    assert len(timeline) == 0
+    timeline.update(0.5)
+    assert state["a"] == 5.0
+
+
+def test_cancel_before_its_turn():
+    timeline = Timeline()
+    state = {"a": 0.0, "b": 0.0}
+    holder = {}
+    timeline.add(state, "a", 0.0, 1.0, 1.0, on_done=lambda: timeline.cancel(holder["tb"]))
+    holder["tb"] = timeline.add(state, "b", 0.0, 10.0, 2.0)
+    timeline.update(1.0)
+    # tb comes after ta, so it is skipped this frame
+    assert state["b"] == 0.0
+    assert len(timeline) == 0